@@ -0,0 +1,40 @@
+"""Общая обвязка для бенчмарков.
+
+Бенчмарки запускаются из папки с manage.py как модули, например
+``python -m benchmarks.digests``. Каждый работает на отдельной
+тестовой базе, которая удаляется по завершении.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    setup_test_environment, teardown_test_environment
+)
+
+
+@contextmanager
+def test_database():
+    """Создаёт временную базу на время бенчмарка."""
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+@contextmanager
+def timer(label):
+    """Печатает время выполнения блока."""
+    start = time.perf_counter()
+    yield
+    print(f'{label}: {time.perf_counter() - start:.3f} с')
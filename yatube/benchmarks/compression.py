@@ -0,0 +1,82 @@
+"""Бенчмарк сжатия страниц: время процессора против сэкономленных байт.
+
+    python -m benchmarks.compression --posts 10 --repeat 200
+"""
+import argparse
+import gzip
+import time
+
+from .common import test_database
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from core.middleware import brotli  # noqa: E402
+from posts.models import Comment, Group, Post  # noqa: E402
+
+User = get_user_model()
+
+TEXT = (
+    'Социальная сеть блогеров. Благодаря этому проекту можно будет '
+    'общаться с друзьями из разных городов. '
+) * 5
+
+
+def pages(posts):
+    author = User.objects.create_user(
+        username='author', first_name='Лев', last_name='Толстой'
+    )
+    group = Group.objects.create(title='Группа', slug='group')
+    for i in range(posts):
+        post = Post.objects.create(author=author, text=TEXT, group=group)
+        for j in range(5):
+            Comment.objects.create(
+                post=post, author=author, text=f'Комментарий {j}'
+            )
+    client = Client()
+    return {
+        'index': client.get(reverse('posts:index')).content,
+        'post_detail': client.get(
+            reverse('posts:post_detail', kwargs={'post_id': post.pk})
+        ).content,
+    }
+
+
+def codecs():
+    for level in (1, 6, 9):
+        yield f'gzip-{level}', lambda data, level=level: gzip.compress(
+            data, level, mtime=0
+        )
+    if brotli is not None:
+        for quality in (1, 5, 11):
+            yield f'br-{quality}', lambda data, q=quality: brotli.compress(
+                data, quality=q
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    with test_database(), override_settings(DEBUG=False):
+        bodies = pages(args.posts)
+    print(f'{"страница":<12} {"кодек":<8} {"байт":>8} {"сжато":>8} '
+          f'{"экономия":>9} {"мкс":>8}')
+    for page, body in bodies.items():
+        for name, codec in codecs():
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                compressed = codec(body)
+            elapsed = (time.perf_counter() - start) / args.repeat
+            saved = 1 - len(compressed) / len(body)
+            print(f'{page:<12} {name:<8} {len(body):>8} '
+                  f'{len(compressed):>8} {saved:>8.0%} '
+                  f'{elapsed * 1e6:>8.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Бенчмарк сборки дайджестов.
+
+    python -m benchmarks.digests --users 100000 --follows 1000000
+"""
+import argparse
+import random
+from datetime import timedelta
+
+from .common import test_database, timer
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from posts.digests import batched, build_messages  # noqa: E402
+from posts.digests import collect_digests  # noqa: E402
+from posts.models import Follow, Post  # noqa: E402
+
+User = get_user_model()
+
+BULK = 500
+
+
+def populate(users, follows, posts):
+    rng = random.Random(0)
+    User.objects.bulk_create(
+        (User(username=f'user{i}', email=f'user{i}@example.com')
+         for i in range(users)),
+        batch_size=BULK,
+    )
+    ids = list(User.objects.values_list('pk', flat=True))
+    authors = ids[:max(1, len(ids) // 10)]
+    edges = set()
+    while len(edges) < follows:
+        edges.add((rng.choice(ids), rng.choice(authors)))
+    Follow.objects.bulk_create(
+        (Follow(user_id=user, author_id=author) for user, author in edges),
+        batch_size=BULK,
+    )
+    Post.objects.bulk_create(
+        (Post(author_id=rng.choice(authors), text=f'Пост {i}')
+         for i in range(posts)),
+        batch_size=BULK,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--follows', type=int, default=1000000)
+    parser.add_argument('--posts', type=int, default=20000)
+    args = parser.parse_args()
+
+    with test_database():
+        with timer('Заполнение базы'):
+            populate(args.users, args.follows, args.posts)
+        since = timezone.now() - timedelta(days=1)
+        until = timezone.now()
+        digests = messages = 0
+        with timer('Сборка дайджестов'):
+            batches = batched(
+                collect_digests(since, until), settings.DIGEST_BATCH_SIZE
+            )
+            for batch in batches:
+                digests += len(batch)
+                messages += len(build_messages(batch))
+        print(f'Подписчиков с дайджестом: {digests}, писем: {messages}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""Пропускная способность проверки паролей в пуле хэширования.
+
+    PASSWORD_HASHER=argon2 python -m benchmarks.hashing --checks 64
+
+Печатает число проверок в секунду всего и на один поток пула
+для текущего хэшера и его настроек стоимости.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import common  # noqa: F401
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import hashers as django_hashers  # noqa: E402
+
+from users.hashers import HashingPool  # noqa: E402
+
+PASSWORD = 'Test1234'
+
+
+def throughput(workers, checks):
+    pool = HashingPool(workers, checks)
+    encoded = django_hashers.make_password(PASSWORD)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=checks) as clients:
+        list(clients.map(
+            lambda _: pool.run(
+                django_hashers.check_password, PASSWORD, encoded
+            ),
+            range(checks),
+        ))
+    return checks / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--checks', type=int, default=64)
+    args = parser.parse_args()
+    print(f'Хэшер: {settings.PASSWORD_HASHERS[0]}')
+    for workers in sorted({1, 2, os.cpu_count() or 1}):
+        rate = throughput(workers, args.checks)
+        print(f'потоков {workers}: {rate:.1f} проверок/с, '
+              f'{rate / workers:.1f} на поток')
+
+
+if __name__ == '__main__':
+    main()
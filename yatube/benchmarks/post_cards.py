@@ -0,0 +1,52 @@
+"""Время отрисовки карточки поста: шаблон против posts.cards.
+
+    python -m benchmarks.post_cards --posts 100 --repeat 20
+"""
+import argparse
+import time
+
+from .common import test_database
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.template.loader import get_template  # noqa: E402
+
+from posts.cards import render_card  # noqa: E402
+from posts.models import Group, Post  # noqa: E402
+
+User = get_user_model()
+
+
+def per_card(render, posts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for post in posts:
+            render(post)
+    return (time.perf_counter() - start) / (repeat * len(posts)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--posts', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    with test_database():
+        author = User.objects.create_user(
+            username='author', first_name='Лев', last_name='Толстой'
+        )
+        group = Group.objects.create(title='Группа', slug='group')
+        Post.objects.bulk_create(
+            Post(author=author, group=group, text=f'Пост номер {i} ' * 20)
+            for i in range(args.posts)
+        )
+        posts = list(Post.objects.select_related('author', 'group'))
+        template = get_template('posts/includes/post_list.html')
+        slow = per_card(
+            lambda post: template.render({'post': post}), posts, args.repeat
+        )
+        fast = per_card(render_card, posts, args.repeat)
+    print(f'шаблон: {slow:.1f} мкс на карточку')
+    print(f'posts.cards: {fast:.1f} мкс на карточку ({slow / fast:.1f}×)')
+
+
+if __name__ == '__main__':
+    main()
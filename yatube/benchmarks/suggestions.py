@@ -0,0 +1,55 @@
+"""Время расчёта рекомендаций на синтетическом графе подписок.
+
+    python -m benchmarks.suggestions --users 1000000 --edges 10000000
+
+Граф строится сразу в памяти, без базы: популярность авторов
+распределена по закону Ципфа, как в настоящих соцсетях.
+"""
+import argparse
+import resource
+
+from . import common  # noqa: F401
+from .common import timer
+
+from django.conf import settings  # noqa: E402
+
+from posts.suggestions import compute, np, sparse  # noqa: E402
+
+
+def synthetic_graph(users, edges, seed=0):
+    random = np.random.default_rng(seed)
+    readers = random.integers(1, users, edges, dtype=np.int32)
+    authors = (random.zipf(1.3, edges) % users).astype(np.int32)
+    graph = sparse.csr_matrix(
+        (np.ones(edges, dtype=np.float32), (readers, authors)),
+        shape=(users, users),
+    )
+    graph.data[:] = 1
+    return graph
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--edges', type=int, default=1000000)
+    parser.add_argument('--block', type=int,
+                        default=settings.SUGGESTIONS_BLOCK)
+    args = parser.parse_args()
+    with timer('построение графа'):
+        graph = synthetic_graph(args.users, args.edges)
+    total = 0
+    with timer(f'рекомендации для {args.users} читателей'):
+        for _, suggestions in compute(
+                graph,
+                settings.SUGGESTIONS_COUNT,
+                settings.SUGGESTIONS_CO_FOLLOW_WEIGHT,
+                settings.SUGGESTIONS_MAX_FOLLOWERS,
+                settings.SUGGESTIONS_SIMILAR,
+                args.block):
+            total += sum(len(best) for best in suggestions.values())
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024
+    print(f'рекомендаций: {total}, пик памяти: {peak} МБ')
+
+
+if __name__ == '__main__':
+    main()
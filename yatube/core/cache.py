@@ -0,0 +1,13 @@
+"""Проверка, общий ли кэш у процессов.
+
+LocMemCache живёт в памяти одного процесса: запись, сброшенная
+в одном воркере, остаётся в остальных. Кэши, которые обязаны
+сбрасываться во всех воркерах сразу, включаются только
+на общем бэкенде (memcached, Redis, база, файлы).
+"""
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def is_shared(alias='default'):
+    return not isinstance(caches[alias], LocMemCache)
@@ -0,0 +1,16 @@
+"""Ленивые значения контекста шаблонов.
+
+Контекстные процессоры выполняются при каждом render(), даже если
+шаблону их значения не нужны. Процессоры проекта поэтому отдают
+SimpleLazyObject: значение вычисляется при первом обращении шаблона
+и дальше берётся готовым.
+"""
+from django.utils.functional import SimpleLazyObject
+
+
+def lazy_context(**factories):
+    """Словарь контекста из функций без аргументов, вызываемых лениво."""
+    return {
+        name: SimpleLazyObject(factory)
+        for name, factory in factories.items()
+    }
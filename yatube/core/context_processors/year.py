@@ -1,9 +1,8 @@
 from datetime import datetime
 
+from .lazy import lazy_context
+
 
 def year(request):
     """Добавляет переменную с текущим годом."""
-    year = datetime.now().year
-    return {
-        'year': year
-    }
+    return lazy_context(year=lambda: datetime.now().year)
@@ -0,0 +1,93 @@
+import time
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.template import engines
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils.functional import SimpleLazyObject, empty
+
+
+class Command(BaseCommand):
+    help = (
+        'Запрашивает страницы и показывает время каждого контекстного '
+        'процессора на запрос: вызов процессора и вычисление ленивых '
+        'значений, к которым обратился шаблон.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', default=['/'])
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument(
+            '--user', help='Имя пользователя, от которого делать запросы.'
+        )
+
+    def handle(self, *args, **options):
+        # Адрес не из INTERNAL_IPS: без панели отладки, как у посетителей.
+        client = Client(REMOTE_ADDR='192.0.2.1')
+        if options['user']:
+            User = get_user_model()
+            try:
+                client.force_login(
+                    User.objects.get(username=options['user'])
+                )
+            except User.DoesNotExist:
+                raise CommandError(f'Нет пользователя {options["user"]}')
+
+        engine = engines['django'].engine
+        processors = engine.template_context_processors
+        timings = defaultdict(float)
+        engine.template_context_processors = tuple(
+            timed(processor, timings) for processor in processors
+        )
+        requests = 0
+        try:
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                for path in options['paths']:
+                    for _ in range(options['repeat']):
+                        client.get(path)
+                        requests += 1
+        finally:
+            del engine.template_context_processors
+
+        self.stdout.write(f'Запросов: {requests}, мкс на запрос:')
+        for processor in processors:
+            name = f'{processor.__module__}.{processor.__qualname__}'
+            call = timings[name, 'call'] / requests * 1e6
+            lazy = timings[name, 'lazy'] / requests * 1e6
+            self.stdout.write(
+                f'{name}: вызов {call:.1f}, ленивые значения {lazy:.1f}'
+            )
+
+
+def timed(processor, timings):
+    """Процессор, который учитывает своё время и время ленивых значений."""
+    name = f'{processor.__module__}.{processor.__qualname__}'
+
+    def wrapper(request):
+        start = time.perf_counter()
+        context = processor(request)
+        timings[name, 'call'] += time.perf_counter() - start
+        for value in context.values():
+            # Атрибуты SimpleLazyObject меняются через __dict__:
+            # обычное присваивание вычислило бы значение.
+            if (isinstance(value, SimpleLazyObject)
+                    and value._wrapped is empty):
+                value.__dict__['_setupfunc'] = timed_factory(
+                    value._setupfunc, name, timings
+                )
+        return context
+
+    return wrapper
+
+
+def timed_factory(factory, name, timings):
+    def wrapper():
+        start = time.perf_counter()
+        try:
+            return factory()
+        finally:
+            timings[name, 'lazy'] += time.perf_counter() - start
+
+    return wrapper
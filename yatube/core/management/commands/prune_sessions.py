@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет истёкшие сессии пачками, не блокируя таблицу сессий '
+        'одним большим DELETE.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.SESSION_PRUNE_BATCH_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        expired = Session.objects.filter(expire_date__lt=now)
+        total = 0
+        while True:
+            keys = list(
+                expired.values_list('session_key', flat=True)[
+                    :options['batch_size']
+                ]
+            )
+            if not keys:
+                break
+            Session.objects.filter(session_key__in=keys).delete()
+            total += len(keys)
+        self.stdout.write(f'Удалено сессий: {total}')
@@ -0,0 +1,146 @@
+import gzip
+import zlib
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.contrib.auth.models import AnonymousUser
+from django.utils.cache import patch_vary_headers
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def accepted_encodings(header):
+    """Кодировки из Accept-Encoding, которые клиент не запретил через q=0."""
+    accepted = set()
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        params = params.replace(' ', '')
+        if params.startswith('q='):
+            try:
+                if float(params[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def choose_encoding(request):
+    accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted or '*' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=settings.COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(data, settings.COMPRESS_GZIP_LEVEL, mtime=0)
+
+
+def compress_stream(chunks, encoding):
+    """Сжимает поток по частям, отдавая каждую часть сразу."""
+    if encoding == 'br':
+        compressor = brotli.Compressor(
+            quality=settings.COMPRESS_BROTLI_QUALITY
+        )
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+        return
+    compressor = zlib.compressobj(
+        settings.COMPRESS_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+    )
+    for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Сжимает ответы в Brotli или gzip по Accept-Encoding клиента.
+
+    Короткие ответы (меньше COMPRESS_MIN_SIZE байт) и уже сжатые
+    не трогаются. Потоковые ответы сжимаются по частям, кроме
+    server-sent events, которым нужна доставка каждого события.
+    """
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '')
+        if content_type.startswith('text/event-stream'):
+            return response
+        if (not response.streaming
+                and len(response.content) < settings.COMPRESS_MIN_SIZE):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding
+            )
+            del response['Content-Length']
+        else:
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
+
+
+def anonymous_marker(session_key):
+    return salted_hmac('core.anonymous', session_key).hexdigest()
+
+
+class AnonymousSessionMiddleware(MiddlewareMixin):
+    """Не читает сессию, про которую уже известно, что она анонимна.
+
+    Когда сессия без входа уже прочитана, в ответ ставится cookie
+    ANONYMOUS_COOKIE_NAME с подписью ключа сессии. Пока подпись
+    совпадает, request.user — AnonymousUser без запроса к сессии.
+    Вход в Django всегда меняет ключ сессии, так что после входа
+    подпись перестаёт совпадать. Ставится после AuthenticationMiddleware.
+    """
+
+    def process_request(self, request):
+        session_key = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        marker = request.COOKIES.get(settings.ANONYMOUS_COOKIE_NAME)
+        if session_key and marker and constant_time_compare(
+            marker, anonymous_marker(session_key)
+        ):
+            request.user = AnonymousUser()
+
+    def process_response(self, request, response):
+        session = getattr(request, 'session', None)
+        if session is None or not session.accessed:
+            return response
+        name = settings.ANONYMOUS_COOKIE_NAME
+        if session.session_key and SESSION_KEY not in session:
+            response.set_cookie(
+                name,
+                anonymous_marker(session.session_key),
+                max_age=settings.SESSION_COOKIE_AGE,
+                secure=settings.SESSION_COOKIE_SECURE or None,
+                httponly=True,
+                samesite=settings.SESSION_COOKIE_SAMESITE,
+            )
+        elif name in request.COOKIES:
+            response.delete_cookie(name)
+        return response
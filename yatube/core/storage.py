@@ -0,0 +1,97 @@
+import gzip
+import hashlib
+import os
+import posixpath
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def content_hash(content):
+    """sha256 содержимого файла, читаемого по частям."""
+    digest = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return digest.hexdigest()
+
+
+def content_name(name, digest):
+    """Путь файла по хэшу: <папка>/ab/cd/<хэш><расширение>."""
+    directory = posixpath.dirname(name)
+    extension = os.path.splitext(name)[1].lower()
+    return posixpath.join(
+        directory, digest[:2], digest[2:4], digest + extension
+    )
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранилище, раскладывающее файлы по хэшу содержимого.
+
+    Имя от клиента не используется: одинаковые файлы попадают
+    по одному пути и хранятся один раз, коллизий имён нет.
+    Повторно сохранённый файл получает свежее время изменения,
+    и posts.media.release не удаляет его, пока ссылающийся пост
+    ещё не закоммичен.
+    """
+
+    def _save(self, name, content):
+        name = content_name(name, content_hash(content))
+        if self.exists(name):
+            try:
+                os.utime(self.path(name))
+                return name
+            except FileNotFoundError:
+                pass
+        return super()._save(name, content)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хэшем в имени и заранее сжатыми копиями.
+
+    При collectstatic рядом с каждым хэшированным текстовым файлом
+    кладутся .gz и, если установлен brotli, .br. Веб-сервер отдаёт
+    их без сжатия на лету (gzip_static и brotli_static в nginx).
+    """
+    compressible = ('.css', '.js', '.svg', '.ico', '.txt', '.json', '.map')
+    min_size = 256
+
+    def post_process(self, paths, dry_run=False, **options):
+        processed_names = []
+        for name, hashed_name, processed in super().post_process(
+            paths, dry_run, **options
+        ):
+            if hashed_name and not isinstance(processed, Exception):
+                processed_names.append(hashed_name)
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for name in processed_names:
+            if name.endswith(self.compressible):
+                self.compress(name)
+
+    def compress(self, name):
+        with self.open(name) as source:
+            data = source.read()
+        if len(data) < self.min_size:
+            return
+        variants = [('.gz', gzip.compress(data, 9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(data)))
+        for suffix, compressed in variants:
+            if len(compressed) >= len(data):
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(compressed))
@@ -0,0 +1,169 @@
+import gzip
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.cached_db import SessionStore
+from django.contrib.sessions.models import Session
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Group
+
+from .context_processors.year import year
+from .middleware import CompressionMiddleware, brotli
+
+User = get_user_model()
+
+TEMP_STATIC_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(
+    STATIC_ROOT=TEMP_STATIC_ROOT,
+    STATICFILES_STORAGE='core.storage.CompressedManifestStaticFilesStorage',
+)
+class StaticFilesTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_STATIC_ROOT, ignore_errors=True)
+
+    def test_collectstatic_hashes_and_compresses(self):
+        """collectstatic кладёт хэшированные файлы и их сжатые копии."""
+        call_command('collectstatic', interactive=False, verbosity=0)
+        name = staticfiles_storage.stored_name('css/bootstrap.min.css')
+        self.assertNotEqual(name, 'css/bootstrap.min.css')
+        path = os.path.join(TEMP_STATIC_ROOT, name)
+        self.assertTrue(os.path.exists(path + '.gz'))
+        self.assertLess(
+            os.path.getsize(path + '.gz'), os.path.getsize(path)
+        )
+
+
+class CompressionMiddlewareTests(TestCase):
+    def test_negotiated_encoding(self):
+        """Ответ сжимается кодировкой, которую принимает клиент."""
+        cases = {
+            'gzip': 'gzip',
+            'gzip, br': 'br' if brotli else 'gzip',
+            'br;q=0, gzip': 'gzip',
+            'identity': None,
+        }
+        for header, encoding in cases.items():
+            with self.subTest(header=header):
+                response = self.client.get(
+                    reverse('posts:index'), HTTP_ACCEPT_ENCODING=header
+                )
+                self.assertEqual(response.get('Content-Encoding'), encoding)
+                self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_gzip_body_decodes(self):
+        """Сжатая страница распаковывается в исходную."""
+        plain = self.client.get(reverse('about:author')).content
+        response = self.client.get(
+            reverse('about:author'), HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertEqual(gzip.decompress(response.content), plain)
+
+    def test_stream_compressed_by_chunks(self):
+        """Потоковый ответ сжимается по частям."""
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        response = StreamingHttpResponse(iter([b'a' * 1000, b'b' * 1000]))
+        response = CompressionMiddleware().process_response(
+            request, response
+        )
+        self.assertEqual(
+            gzip.decompress(b''.join(response.streaming_content)),
+            b'a' * 1000 + b'b' * 1000
+        )
+
+
+class SessionTests(TestCase):
+    def visit_anonymously(self):
+        session = SessionStore()
+        session['seen'] = True
+        session.save()
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = (
+            session.session_key
+        )
+        self.client.get(reverse('posts:index'))
+        self.assertIn(settings.ANONYMOUS_COOKIE_NAME, self.client.cookies)
+
+    def test_anonymous_feeds_do_not_query_sessions(self):
+        """Ленты для анонима не читают сессию ни из кэша, ни из базы."""
+        Group.objects.create(title='Группа', slug='group')
+        self.visit_anonymously()
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': 'group'}),
+        ):
+            with self.subTest(url=url):
+                cache.clear()
+                with CaptureQueriesContext(connection) as queries:
+                    self.client.get(url)
+                self.assertFalse(
+                    [q for q in queries if 'django_session' in q['sql']]
+                )
+
+    def test_login_after_anonymous_visit(self):
+        """После входа отметка анонимной сессии больше не действует."""
+        self.visit_anonymously()
+        user = User.objects.create_user(username='user')
+        self.client.force_login(user)
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(response.context['user'], user)
+
+    def test_prune_sessions(self):
+        """Истёкшие сессии удаляются, живые остаются."""
+        now = timezone.now()
+        Session.objects.bulk_create(
+            Session(
+                session_key=f'key{i}',
+                session_data='',
+                expire_date=now + timedelta(days=i - 5, hours=1),
+            )
+            for i in range(10)
+        )
+        call_command('prune_sessions', batch_size=2, stdout=StringIO())
+        self.assertEqual(Session.objects.count(), 5)
+
+
+class ContextProcessorTests(TestCase):
+    def test_profile_context_processors(self):
+        """Отчёт перечисляет все процессоры с временем на запрос."""
+        out = StringIO()
+        call_command(
+            'profile_context_processors', reverse('posts:index'),
+            repeat=2, stdout=out,
+        )
+        report = out.getvalue()
+        self.assertIn('Запросов: 2', report)
+        self.assertIn('core.context_processors.year.year: вызов', report)
+        self.assertIn(
+            'django.contrib.auth.context_processors.auth: вызов', report
+        )
+
+    def test_year_is_lazy(self):
+        """Год вычисляется, только когда шаблон к нему обращается."""
+        request = RequestFactory().get('/')
+        with mock.patch('core.context_processors.year.datetime') as clock:
+            clock.now.return_value.year = 2026
+            context = year(request)
+            clock.now.assert_not_called()
+            self.assertEqual(
+                Template('{{ year }}').render(Context(context)), '2026'
+            )
+            clock.now.assert_called_once()
@@ -1,16 +1,107 @@
+from django.conf import settings
 from django.contrib import admin
+from django.db.models import Q
 
-from .models import Group, Post, Follow
+from . import moderation
+from .models import Comment, Digest, Follow, Group, Post, Tag
+from .utils import EstimatedCountPaginator
+
+
+def batch_action(purge, description):
+    """Действие админки, удаляющее выбранное пачками."""
+    def action(modeladmin, request, queryset):
+        done = purge(queryset, settings.MODERATION_BATCH_SIZE)
+        modeladmin.message_user(request, f'Удалено: {done}')
+    action.short_description = description
+    action.__name__ = f'batch_{purge.__name__}'
+    return action
+
+
+def remove_group(modeladmin, request, queryset):
+    done = moderation.reassign_posts(
+        queryset, None, settings.MODERATION_BATCH_SIZE
+    )
+    modeladmin.message_user(request, f'Убрано из групп: {done}')
+
+
+remove_group.short_description = 'Убрать выбранные посты из групп'
 
 
 class PostAdmin(admin.ModelAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group')
     list_editable = ('group',)
-    search_fields = ('text',)
+    list_select_related = ('author', 'group')
+    autocomplete_fields = ('author', 'group')
+    search_fields = ('=author__username', '=group__slug', '=tags__name')
+    exclude = ('tags', 'mentions')
+    readonly_fields = ('score',)
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = (
+        batch_action(moderation.purge_posts, 'Удалить выбранные посты'),
+        remove_group,
+    )
+
+    def get_search_results(self, request, queryset, search_term):
+        """Поиск только точным совпадением по индексированным полям:
+        id поста, имени автора, слагу группы или хэштегу."""
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        query = (
+            Q(author__username=term.lstrip('@'))
+            | Q(group__slug=term)
+            | Q(pk__in=Post.tags.through.objects.filter(
+                tag__name=term.lstrip('#').lower()
+            ).values('post_id'))
+        )
+        if term.isdigit():
+            query |= Q(pk=term)
+        return queryset.filter(query), False
+
+
+class GroupAdmin(admin.ModelAdmin):
+    list_display = ('title', 'slug', 'post_count', 'last_post_date')
+    search_fields = ('title', 'slug')
+    readonly_fields = ('post_count', 'last_post_date')
+    prepopulated_fields = {'slug': ('title',)}
+
+
+class CommentAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'text', 'created', 'author', 'post')
+    list_select_related = ('author', 'post')
+    autocomplete_fields = ('author',)
+    raw_id_fields = ('post',)
+    list_filter = ('created',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = (
+        batch_action(
+            moderation.purge_comments, 'Удалить выбранные комментарии'
+        ),
+    )
+
+
+class FollowAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'user', 'author')
+    list_select_related = ('user', 'author')
+    autocomplete_fields = ('user', 'author')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = (
+        batch_action(moderation.purge_follows, 'Удалить выбранные подписки'),
+    )
+
+
+class TagAdmin(admin.ModelAdmin):
+    search_fields = ('=name',)
 
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
-admin.site.register(Follow)
+admin.site.register(Group, GroupAdmin)
+admin.site.register(Comment, CommentAdmin)
+admin.site.register(Follow, FollowAdmin)
+admin.site.register(Tag, TagAdmin)
+admin.site.register(Digest)
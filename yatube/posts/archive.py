@@ -0,0 +1,98 @@
+"""Перенос старых постов и их комментариев в архивные таблицы.
+
+Ленты читают только основную таблицу постов, поэтому она и её
+индексы остаются небольшими. Страница поста при промахе
+ищет его в архиве. История правок переносится вместе с постом,
+а теги и упоминания нет: они заново извлекаются из текста.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.http import Http404
+
+from . import counters
+from .models import (
+    ArchivedComment, ArchivedPost, ArchivedPostRevision, Comment, Post,
+    PostRevision
+)
+from .signals import bulk_changes
+from .unread import forget_followers_unread
+from .utils import bump_count_version
+
+POST_FIELDS = ('id', 'text', 'author_id', 'group_id', 'image',
+               'pub_date', 'updated')
+COMMENT_FIELDS = ('id', 'post_id', 'author_id', 'text', 'created')
+REVISION_FIELDS = ('post_id', 'number', 'delta', 'snapshot', 'created')
+
+
+@transaction.atomic
+def archive_batch(cutoff, batch_size):
+    """Переносит в архив одну пачку постов старше cutoff.
+
+    Удаление идёт без пообъектных обработчиков: счётчики групп
+    и кэши поправляются один раз на пачку.
+    """
+    ids = list(
+        Post.objects
+        .filter(pub_date__lt=cutoff)
+        .order_by('pk')
+        .values_list('pk', flat=True)[:batch_size]
+    )
+    if not ids:
+        return 0
+    rows = list(Post.objects.filter(pk__in=ids).values(*POST_FIELDS))
+    ArchivedPost.objects.bulk_create(ArchivedPost(**row) for row in rows)
+    ArchivedComment.objects.bulk_create(
+        ArchivedComment(**row)
+        for row in Comment.objects.filter(
+            post_id__in=ids
+        ).values(*COMMENT_FIELDS)
+    )
+    ArchivedPostRevision.objects.bulk_create(
+        ArchivedPostRevision(**row)
+        for row in PostRevision.objects.filter(
+            post_id__in=ids
+        ).values(*REVISION_FIELDS)
+    )
+    with bulk_changes():
+        Post.objects.filter(pk__in=ids).delete()
+    groups = Counter(row['group_id'] for row in rows if row['group_id'])
+    for group_id, count in groups.items():
+        counters.posts_removed(group_id, count)
+    bump_count_version(Post)
+    authors = {row['author_id'] for row in rows}
+    transaction.on_commit(lambda: forget_followers_unread(*authors))
+    return len(ids)
+
+
+def archive_posts(cutoff, batch_size):
+    """Переносит в архив все посты старше cutoff, пачка за пачкой.
+
+    Каждая пачка идёт в своей транзакции, чтобы не держать
+    блокировки надолго. Возвращает число перенесённых постов.
+    """
+    total = 0
+    while True:
+        moved = archive_batch(cutoff, batch_size)
+        if not moved:
+            return total
+        total += moved
+
+
+def get_post_or_archived(post_id):
+    """Пост из основной таблицы или из архива с комментариями."""
+    post = (
+        Post.objects.select_related('author', 'group')
+        .filter(pk=post_id).first()
+    )
+    if post is not None:
+        return post, Comment.objects.select_related('post').filter(
+            post=post_id
+        )
+    post = (
+        ArchivedPost.objects.select_related('author', 'group')
+        .filter(pk=post_id).first()
+    )
+    if post is None:
+        raise Http404('Пост не найден')
+    return post, post.comments.select_related('author')
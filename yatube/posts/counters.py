@@ -0,0 +1,35 @@
+"""Денормализованные счётчики групп: число постов и дата последнего.
+
+Счётчики обновляются точечными UPDATE при сохранении и удалении
+поста, так что каталог групп не считает посты агрегатом.
+"""
+from django.db.models import F
+
+from .models import Group, Post
+
+
+def refresh_last_post(group_id):
+    """Пересчитывает дату последнего поста группы по индексу."""
+    last = (
+        Post.objects.filter(group_id=group_id)
+        .order_by('-pub_date')
+        .values_list('pub_date', flat=True)
+        .first()
+    )
+    Group.objects.filter(pk=group_id).update(last_post_date=last)
+
+
+def posts_added(group_id, pub_date, count=1):
+    Group.objects.filter(pk=group_id).update(
+        post_count=F('post_count') + count
+    )
+    Group.objects.filter(pk=group_id).exclude(
+        last_post_date__gte=pub_date
+    ).update(last_post_date=pub_date)
+
+
+def posts_removed(group_id, count=1):
+    Group.objects.filter(pk=group_id).update(
+        post_count=F('post_count') - count
+    )
+    refresh_last_post(group_id)
@@ -0,0 +1,104 @@
+from datetime import timedelta
+from itertools import groupby, islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import Digest, Follow
+
+User = get_user_model()
+
+
+def digest_period():
+    """Период нового дайджеста: от конца прошлой рассылки до текущего
+    момента."""
+    until = timezone.now()
+    last = Digest.objects.only('until').first()
+    if last is None:
+        since = until - timedelta(hours=settings.DIGEST_PERIOD_HOURS)
+    else:
+        since = last.until
+    return since, until
+
+
+def collect_digests(since, until):
+    """Новые посты авторов по подписчикам.
+
+    Все пары «подписчик — пост» за период выбираются одним запросом
+    по таблице подписок, отсортированным по подписчику, и читаются
+    потоком. Отдаёт пары (id подписчика, список постов), в каждом
+    списке не больше DIGEST_POSTS самых свежих постов.
+    """
+    rows = (
+        Follow.objects
+        .filter(
+            author__posts__pub_date__gt=since,
+            author__posts__pub_date__lte=until,
+        )
+        .order_by('user_id', '-author__posts__pub_date')
+        .values_list(
+            'user_id',
+            'author__posts__pk',
+            'author__posts__text',
+            'author__username',
+        )
+        .iterator(chunk_size=settings.DIGEST_BATCH_SIZE * 10)
+    )
+    for user_id, user_rows in groupby(rows, key=lambda row: row[0]):
+        posts = [
+            {'pk': pk, 'text': text, 'author': username}
+            for _, pk, text, username in islice(
+                user_rows, settings.DIGEST_POSTS
+            )
+        ]
+        yield user_id, posts
+
+
+def batched(iterable, size):
+    """Разбивает поток на списки по size элементов."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def build_messages(batch):
+    """Письма для пачки подписчиков; адреса берутся одним запросом."""
+    emails = dict(
+        User.objects
+        .filter(pk__in=[user_id for user_id, _ in batch])
+        .exclude(email='')
+        .values_list('pk', 'email')
+    )
+    messages = []
+    for user_id, posts in batch:
+        if user_id not in emails:
+            continue
+        body = render_to_string('posts/email/digest.txt', {
+            'posts': posts,
+            'site_url': settings.SITE_URL,
+        })
+        messages.append(EmailMessage(
+            subject='Новые записи ваших авторов',
+            body=body,
+            to=[emails[user_id]],
+        ))
+    return messages
+
+
+def send_digests(batch_size=None):
+    """Рассылает дайджесты за новый период и возвращает число писем."""
+    batch_size = batch_size or settings.DIGEST_BATCH_SIZE
+    since, until = digest_period()
+    sent = 0
+    connection = get_connection()
+    with connection:
+        for batch in batched(collect_digests(since, until), batch_size):
+            sent += connection.send_messages(build_messages(batch)) or 0
+    Digest.objects.create(until=until, sent=sent)
+    return sent
@@ -0,0 +1,72 @@
+"""Кэш множества авторов, на которых подписан пользователь.
+
+В кэше id авторов лежат отсортированным массивом array('L'):
+4–8 байт на подписку вместо объекта int в множестве. При чтении
+массив превращается в frozenset, поэтому проверка подписки —
+поиск в памяти, а лента подписок — запрос author_id IN (...) по
+индексу (author, pub_date). Запись сбрасывается сигналами Follow
+и массовыми операциями модерации.
+
+Сброс доходит до всех воркеров только на общем кэше. На LocMemCache
+подписки не кэшируются и читаются из базы, а лента подписок
+строится соединением с Follow.
+"""
+from array import array
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.cache import is_shared
+
+from .models import Follow, Post
+
+FOLLOWED_KEY = 'posts:followed:{}'
+
+# SQLite принимает не больше 999 параметров в запросе.
+MAX_IN_IDS = 900
+
+
+def cached_followed_ids(user):
+    """Множество id авторов из кэша или None, если кэш не общий."""
+    if not is_shared():
+        return None
+    key = FOLLOWED_KEY.format(user.pk)
+    ids = cache.get(key)
+    if ids is None:
+        ids = array('L', sorted(
+            Follow.objects.filter(user=user)
+            .values_list('author_id', flat=True)
+        ))
+        cache.set(key, ids, settings.FOLLOWED_CACHE_TIMEOUT)
+    return frozenset(ids)
+
+
+def followed_ids(user):
+    """Множество id авторов, на которых подписан user."""
+    ids = cached_followed_ids(user)
+    if ids is None:
+        ids = frozenset(
+            Follow.objects.filter(user=user)
+            .values_list('author_id', flat=True)
+        )
+    return ids
+
+
+def is_following(user, author):
+    return user.is_authenticated and author.pk in followed_ids(user)
+
+
+def followed_posts(user):
+    """Посты избранных авторов.
+
+    Очень длинный список подписок заменяется соединением с Follow,
+    чтобы не упереться в ограничение числа параметров.
+    """
+    ids = cached_followed_ids(user)
+    if ids is None or len(ids) > MAX_IN_IDS:
+        return Post.objects.filter(author__following__user=user)
+    return Post.objects.filter(author_id__in=ids)
+
+
+def forget(*user_ids):
+    cache.delete_many([FOLLOWED_KEY.format(pk) for pk in user_ids])
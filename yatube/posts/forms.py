@@ -1,5 +1,7 @@
+from django.core.files.uploadedfile import UploadedFile
 from django.forms import ModelForm
 
+from .images import BoundedImageField, normalize
 from .models import Comment, Post
 
 
@@ -7,6 +9,13 @@ class PostForm(ModelForm):
     class Meta:
         model = Post
         fields = ['text', 'group', 'image']
+        field_classes = {'image': BoundedImageField}
+
+    def clean_image(self):
+        image = self.cleaned_data.get('image')
+        if isinstance(image, UploadedFile):
+            return normalize(image)
+        return image
 
 
 class CommentForm(ModelForm):
@@ -0,0 +1,86 @@
+"""История правок постов.
+
+Версия n — текст поста после n правок, последняя версия лежит
+в самом посте. Ревизия с номером n хранит разность, превращающую
+версию n + 1 в версию n, поэтому место растёт с размером правок,
+а не с длиной поста. Каждая POST_SNAPSHOT_EVERY-я ревизия хранит
+текст целиком, чтобы восстановление не проходило всю историю.
+"""
+import json
+from difflib import SequenceMatcher
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import PostRevision
+
+
+def make_delta(base, target):
+    """Разность: отрезки [начало, конец] из base и вставленные строки."""
+    ops = []
+    matcher = SequenceMatcher(None, base, target, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append(target[j1:j2])
+    return json.dumps(ops, ensure_ascii=False, separators=(',', ':'))
+
+
+def apply_delta(base, delta):
+    return ''.join(
+        op if isinstance(op, str) else base[op[0]:op[1]]
+        for op in json.loads(delta)
+    )
+
+
+def version_count(post):
+    """Номер текущей версии поста."""
+    return post.revisions.count()
+
+
+@transaction.atomic
+def record_edit(post, old_text):
+    """Сохраняет прежний текст поста перед правкой.
+
+    Вызывается, когда в post.text уже лежит новый текст.
+    """
+    if old_text == post.text:
+        return None
+    number = version_count(post)
+    revision = PostRevision(post=post, number=number)
+    if number % settings.POST_SNAPSHOT_EVERY == 0:
+        revision.snapshot = old_text
+    else:
+        revision.delta = make_delta(post.text, old_text)
+    revision.save()
+    return revision
+
+
+def text_at(post, number):
+    """Восстанавливает текст поста версии number."""
+    current = version_count(post)
+    if not 0 <= number <= current:
+        raise PostRevision.DoesNotExist
+    if number == current:
+        return post.text
+    snapshot = (
+        post.revisions
+        .filter(number__gte=number, snapshot__isnull=False)
+        .order_by('number')
+        .values_list('number', 'snapshot')
+        .first()
+    )
+    if snapshot is None:
+        start, text = current, post.text
+    else:
+        start, text = snapshot
+    deltas = (
+        post.revisions
+        .filter(number__gte=number, number__lt=start)
+        .order_by('-number')
+        .values_list('delta', flat=True)
+    )
+    for delta in deltas:
+        text = apply_delta(text, delta)
+    return text
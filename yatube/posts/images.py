@@ -0,0 +1,108 @@
+"""Проверка и обработка загружаемых картинок.
+
+Размеры картинки проверяются по заголовку до декодирования,
+поэтому огромная картинка отклоняется, не заняв память воркера.
+Бюджет памяти — размер растра после декодирования: ширина × высота
+× байты на пиксель, для JPEG с учётом уменьшения в режиме draft.
+Остальные форматы декодируются целиком, поэтому для них действует
+и более низкий предел IMAGE_MAX_FULL_DECODE_PIXELS.
+Крупные оригиналы уменьшаются до IMAGE_MAX_SIDE (JPEG — сразу
+при декодировании в режиме draft) и поворачиваются по тегу
+Orientation из EXIF, метаданные отбрасываются. Анимированные
+картинки (GIF, WebP, APNG) не пересжимаются и хранятся как есть:
+Pillow сохранил бы только первый кадр.
+"""
+import os
+from io import BytesIO
+
+from django import forms
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image, ImageOps
+
+Image.MAX_IMAGE_PIXELS = settings.IMAGE_MAX_PIXELS
+
+REENCODED_FORMATS = {'JPEG': 'JPEG', 'MPO': 'JPEG', 'PNG': 'PNG',
+                     'WEBP': 'WEBP'}
+# Палитра при уменьшении разворачивается в RGBA.
+PIXEL_BYTES = {'1': 1, 'L': 1, 'LA': 2, 'I;16': 2, 'RGB': 3, 'YCbCr': 3}
+
+
+def decoded_size(image):
+    """Размер растра, который получится при декодировании для normalize."""
+    width, height = image.size
+    if REENCODED_FORMATS.get(image.format) == 'JPEG':
+        side = settings.IMAGE_MAX_SIDE
+        scale = 1
+        while scale < 8 and min(width, height) // (scale * 2) >= side:
+            scale *= 2
+        return -(-width // scale), -(-height // scale)
+    return width, height
+
+
+def raster_bytes(image):
+    width, height = decoded_size(image)
+    return width * height * PIXEL_BYTES.get(image.mode, 4)
+
+
+def check_header(upload):
+    """Проверяет размер файла и картинки, не декодируя пиксели."""
+    if upload.size > settings.IMAGE_MAX_UPLOAD_SIZE:
+        raise ValidationError('Файл картинки слишком большой.')
+    upload.seek(0)
+    try:
+        image = Image.open(upload)
+    except (OSError, Image.DecompressionBombError):
+        raise ValidationError('Загрузите правильное изображение.')
+    width, height = image.size
+    max_pixels = settings.IMAGE_MAX_PIXELS
+    if REENCODED_FORMATS.get(image.format) != 'JPEG':
+        max_pixels = min(max_pixels, settings.IMAGE_MAX_FULL_DECODE_PIXELS)
+    if width * height > max_pixels:
+        raise ValidationError(
+            f'Картинка слишком большая: {width}×{height} пикселей.'
+        )
+    if raster_bytes(image) > settings.IMAGE_MEMORY_LIMIT:
+        raise ValidationError('Картинка требует слишком много памяти.')
+    upload.seek(0)
+    return image
+
+
+def normalize(upload):
+    """Уменьшает крупную картинку и убирает из неё метаданные.
+
+    Анимации и форматы без пересжатия (например, GIF)
+    возвращаются как есть.
+    """
+    image = check_header(upload)
+    fmt = REENCODED_FORMATS.get(image.format)
+    if fmt is None or getattr(image, 'is_animated', False):
+        return upload
+    side = settings.IMAGE_MAX_SIDE
+    if fmt == 'JPEG':
+        image.draft('RGB', (side, side))
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail((side, side))
+    if fmt == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    output = BytesIO()
+    options = {'quality': settings.IMAGE_QUALITY} if fmt != 'PNG' else {}
+    image.save(output, format=fmt, **options)
+    name, _ = os.path.splitext(upload.name)
+    extension = {'JPEG': '.jpg', 'PNG': '.png', 'WEBP': '.webp'}[fmt]
+    return SimpleUploadedFile(
+        name + extension,
+        output.getvalue(),
+        content_type=Image.MIME[fmt],
+    )
+
+
+class BoundedImageField(forms.ImageField):
+    """ImageField, проверяющий размеры до полной проверки Django."""
+
+    def to_python(self, data):
+        if data in self.empty_values:
+            return None
+        check_header(data)
+        return super().to_python(data)
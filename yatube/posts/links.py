@@ -0,0 +1,102 @@
+"""Быстрое построение URL приложения posts.
+
+Из маршрутов posts/urls.py один раз строятся строки формата вида
+'profile/%(username)s/' и скомпилированные регулярные выражения.
+Дальше URL собирается подстановкой и одной проверкой шаблона, без
+обхода резолвера на каждый вызов; результат совпадает с
+reverse('posts:...'). Таблица строится для каждого URLconf
+отдельно, как и в reverse: учитывается request.urlconf, выставленный
+middleware. Строится она при первом обращении, а не при старте:
+импорт URLconf из AppConfig.ready() опередил бы admin.autodiscover(),
+так что первый запрос процесса платит за обход резолвера.
+Таблицы сбрасываются при смене ROOT_URLCONF.
+"""
+import re
+from functools import lru_cache
+from urllib.parse import quote
+
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.urls import (
+    NoReverseMatch, get_resolver, get_script_prefix, get_urlconf
+)
+from django.urls.resolvers import get_ns_resolver
+from django.utils.http import RFC3986_SUBDELIMS, escape_leading_slashes
+
+NAMESPACE = 'posts'
+SAFE = RFC3986_SUBDELIMS + '/~:@'
+
+
+class Route:
+    __slots__ = ('name', 'template', 'params', 'converters', 'regex')
+
+    def __init__(self, name, template, params, converters, pattern):
+        self.name = name
+        self.template = template
+        self.params = params
+        self.converters = converters
+        self.regex = re.compile(pattern)
+
+    def build(self, args):
+        if len(args) != len(self.params):
+            raise NoReverseMatch(
+                f"Reverse for '{NAMESPACE}:{self.name}' with arguments "
+                f"'{args}' not found."
+            )
+        subs = {}
+        for param, value in zip(self.params, args):
+            converter = self.converters.get(param)
+            subs[param] = converter.to_url(value) if converter else value
+        path = self.template % subs
+        if not self.regex.match(path):
+            raise NoReverseMatch(
+                f"Reverse for '{NAMESPACE}:{self.name}' with arguments "
+                f"'{args}' not found. Pattern tried: {self.regex.pattern}"
+            )
+        prefix = get_script_prefix()
+        return escape_leading_slashes(quote(prefix + path, safe=SAFE))
+
+
+@lru_cache(maxsize=None)
+def routes(urlconf=None):
+    """Маршруты пространства имён posts в URLconf по имени."""
+    resolver = get_resolver(urlconf)
+    try:
+        ns_pattern, ns_resolver = resolver.namespace_dict[NAMESPACE]
+    except KeyError:
+        return {}
+    if ns_pattern:
+        ns_resolver = get_ns_resolver(
+            ns_pattern, ns_resolver,
+            tuple(ns_resolver.pattern.converters.items()),
+        )
+    table = {}
+    reverse_dict = ns_resolver.reverse_dict
+    for name in reverse_dict:
+        if not isinstance(name, str):
+            continue
+        possibilities, pattern, defaults, converters = (
+            reverse_dict.getlist(name)[0]
+        )
+        template, params = possibilities[0]
+        table[name] = Route(
+            name, template, params, converters, '^' + pattern
+        )
+    return table
+
+
+def posts_url(name, *args):
+    """То же, что reverse(f'posts:{name}', args=args), но быстрее."""
+    try:
+        route = routes(get_urlconf())[name]
+    except KeyError:
+        raise NoReverseMatch(
+            f"Reverse for '{NAMESPACE}:{name}' not found."
+        ) from None
+    return route.build(args)
+
+
+@receiver(setting_changed)
+def reset_routes(setting, **kwargs):
+    if setting == 'ROOT_URLCONF':
+        routes.cache_clear()
@@ -0,0 +1,201 @@
+"""Живая лента комментариев.
+
+Брокер раздаёт события подписчикам внутри процесса. Каждый
+подписчик держит очередь ограниченной длины, число подписчиков
+на процесс тоже ограничено, поэтому память на соединения не растёт
+бесконтрольно. Брокер для нескольких воркеров выбирается настройкой
+LIVE_BROKER.
+
+Поток ответа синхронный и занимает поток воркера на всё время
+соединения, поэтому соединения короткие (LIVE_MAX_DURATION), а их
+число на процесс ограничено LIVE_MAX_SUBSCRIBERS.
+"""
+import json
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+
+class BrokerFull(Exception):
+    """Превышено число подписчиков на процесс."""
+
+
+class Subscription:
+    """Очередь событий одного зрителя со своим условием ожидания:
+    событие канала будит только подписчиков этого канала."""
+    __slots__ = ('channel', 'queue', 'condition')
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.queue = deque(maxlen=settings.LIVE_QUEUE_SIZE)
+        self.condition = threading.Condition()
+
+    def put(self, events):
+        with self.condition:
+            self.queue.extend(events)
+            self.condition.notify()
+
+    def get(self, timeout):
+        """Забирает накопленные события, ожидая не дольше timeout."""
+        with self.condition:
+            self.condition.wait_for(lambda: self.queue, timeout)
+            events = list(self.queue)
+            self.queue.clear()
+        return events
+
+
+class LocalBroker:
+    """Раздача событий подписчикам одного процесса."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.channels = {}
+        self.size = 0
+
+    def subscribe(self, channel):
+        with self.lock:
+            if self.size >= settings.LIVE_MAX_SUBSCRIBERS:
+                raise BrokerFull
+            subscription = Subscription(channel)
+            self.channels.setdefault(channel, set()).add(subscription)
+            self.size += 1
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscribers = self.channels.get(subscription.channel)
+            if subscribers and subscription in subscribers:
+                subscribers.discard(subscription)
+                self.size -= 1
+                if not subscribers:
+                    del self.channels[subscription.channel]
+
+    def publish(self, channel, event):
+        self.fanout(channel, [event])
+
+    def fanout(self, channel, events):
+        with self.lock:
+            subscribers = list(self.channels.get(channel, ()))
+        for subscription in subscribers:
+            subscription.put(events)
+
+
+class CacheBroker(LocalBroker):
+    """Раздача событий между воркерами через общий кэш.
+
+    События складываются в кэш под последовательными номерами.
+    Один фоновый поток на процесс опрашивает только каналы,
+    у которых есть локальные подписчики, и раздаёт новые события
+    через LocalBroker.
+    """
+    SEQ_KEY = 'live:{}:seq'
+    EVENT_KEY = 'live:{}:{}'
+
+    def __init__(self):
+        super().__init__()
+        self.positions = {}
+        self.poller = None
+
+    def subscribe(self, channel):
+        subscription = super().subscribe(channel)
+        with self.lock:
+            self.positions.setdefault(
+                channel, cache.get(self.SEQ_KEY.format(channel), 0)
+            )
+            if self.poller is None:
+                self.poller = threading.Thread(target=self.poll, daemon=True)
+                self.poller.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        super().unsubscribe(subscription)
+        with self.lock:
+            if subscription.channel not in self.channels:
+                self.positions.pop(subscription.channel, None)
+
+    def publish(self, channel, event):
+        seq_key = self.SEQ_KEY.format(channel)
+        cache.add(seq_key, 0, settings.LIVE_EVENT_TIMEOUT)
+        seq = cache.incr(seq_key)
+        cache.set(
+            self.EVENT_KEY.format(channel, seq),
+            event,
+            settings.LIVE_EVENT_TIMEOUT,
+        )
+
+    def poll(self):
+        stop = threading.Event()
+        while not stop.wait(settings.LIVE_POLL_INTERVAL):
+            with self.lock:
+                positions = dict(self.positions)
+            if not positions:
+                continue
+            sequences = cache.get_many(
+                [self.SEQ_KEY.format(channel) for channel in positions]
+            )
+            for channel, position in positions.items():
+                seq = sequences.get(self.SEQ_KEY.format(channel), position)
+                if seq <= position:
+                    continue
+                keys = [
+                    self.EVENT_KEY.format(channel, number)
+                    for number in range(position + 1, seq + 1)
+                ][-settings.LIVE_QUEUE_SIZE:]
+                found = cache.get_many(keys)
+                events = [found[key] for key in keys if key in found]
+                with self.lock:
+                    if channel in self.positions:
+                        self.positions[channel] = seq
+                self.fanout(channel, events)
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    return import_string(settings.LIVE_BROKER)()
+
+
+def comment_event(comment):
+    return {
+        'id': comment.pk,
+        'author': comment.author.username,
+        'text': comment.text,
+    }
+
+
+def sse(event):
+    return (
+        f'id: {event["id"]}\nevent: comment\n'
+        f'data: {json.dumps(event, ensure_ascii=False)}\n\n'
+    )
+
+
+def event_stream(broker, subscription, missed):
+    """Поток server-sent events для одного зрителя.
+
+    Сначала отдаёт пропущенные после переподключения комментарии,
+    затем новые. Соединение закрывается через LIVE_MAX_DURATION
+    секунд и освобождает поток воркера; браузер переподключится
+    через LIVE_RETRY секунд с заголовком Last-Event-ID.
+    """
+    last_id = 0
+    deadline = time.monotonic() + settings.LIVE_MAX_DURATION
+    try:
+        yield f'retry: {settings.LIVE_RETRY * 1000}\n\n'
+        for event in missed:
+            last_id = event['id']
+            yield sse(event)
+        while time.monotonic() < deadline:
+            events = subscription.get(settings.LIVE_HEARTBEAT)
+            if not events:
+                yield ': ping\n\n'
+            for event in events:
+                if event['id'] > last_id:
+                    last_id = event['id']
+                    yield sse(event)
+    finally:
+        broker.unsubscribe(subscription)
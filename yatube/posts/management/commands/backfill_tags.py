@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from posts.tags import backfill
+
+
+class Command(BaseCommand):
+    help = 'Заполняет хэштеги и упоминания для уже созданных постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=200,
+            help='Сколько id постов обрабатывать за один проход.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Число параллельных потоков.',
+        )
+
+    def handle(self, *args, **options):
+        processed = backfill(options['chunk_size'], options['workers'])
+        self.stdout.write(f'Обработано постов: {processed}')
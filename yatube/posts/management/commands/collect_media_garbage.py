@@ -0,0 +1,138 @@
+import os
+import re
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from sorl.thumbnail import default
+from sorl.thumbnail import delete as delete_with_thumbnails
+from sorl.thumbnail.conf import settings as thumbnail_settings
+
+from posts.models import ArchivedPost, Post
+
+CONTENT_NAME_RE = re.compile(
+    r'^posts/([0-9a-f]{2})/([0-9a-f]{2})/(\1\2[0-9a-f]{60})(\.\w+)$'
+)
+
+
+def compact(name):
+    """Ключ для множества ссылок: хэш с расширением или само имя.
+
+    Сжимаются только имена, которые выдаёт ContentAddressedStorage:
+    путь в них однозначно задан хэшем и расширением.
+    """
+    match = CONTENT_NAME_RE.match(name)
+    if match:
+        return bytes.fromhex(match.group(3)) + match.group(4).encode()
+    return name
+
+
+def referenced_names():
+    """Множество картинок, на которые ссылаются посты."""
+    referenced = set()
+    for model in (Post, ArchivedPost):
+        names = (
+            model.objects.exclude(image='')
+            .values_list('image', flat=True)
+            .iterator(chunk_size=10000)
+        )
+        referenced.update(compact(name) for name in names)
+    return referenced
+
+
+def thumbnail_names():
+    """Имена миниатюр, известных хранилищу ключей sorl.
+
+    Публичного способа перечислить их sorl не даёт, поэтому
+    ключи читаются так же, как это делает kvstore.cleanup().
+    """
+    kvstore = default.kvstore
+    names = set()
+    for key in kvstore._find_keys(identity='image'):
+        image = kvstore._get(key)
+        if image is not None:
+            names.add(image.name)
+    return names
+
+
+def walk(directory):
+    """Файлы папки рекурсивно, без построения полного списка."""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from walk(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                yield entry
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет картинки постов, на которые никто не ссылается, '
+        'и миниатюры, которых нет в хранилище ключей sorl.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать, что будет удалено.',
+        )
+        parser.add_argument(
+            '--min-age',
+            type=int,
+            default=3600,
+            help='Не трогать файлы моложе этого числа секунд: '
+                 'пост с ними может ещё сохраняться.',
+        )
+        parser.add_argument(
+            '--progress',
+            type=int,
+            default=10000,
+            help='Печатать прогресс каждые N файлов.',
+        )
+
+    def handle(self, *args, **options):
+        referenced = referenced_names()
+        self.stdout.write(f'Картинок в постах: {len(referenced)}')
+        self.newest = time.time() - options['min_age']
+        self.scanned = self.orphans = self.freed = 0
+        self.collect(
+            'posts', lambda name: compact(name) in referenced,
+            delete_with_thumbnails, options,
+        )
+        if not options['dry_run']:
+            default.kvstore.cleanup()
+        thumbnails = thumbnail_names()
+        self.collect(
+            thumbnail_settings.THUMBNAIL_PREFIX.strip('/'),
+            thumbnails.__contains__, default.storage.delete, options,
+        )
+        self.stdout.write(
+            f'Готово. Просмотрено: {self.scanned}, '
+            f'{"найдено" if options["dry_run"] else "удалено"} '
+            f'сирот: {self.orphans}, {self.freed // 1024} КБ'
+        )
+
+    def collect(self, directory, is_referenced, delete, options):
+        """Удаляет старые файлы папки, на которые нет ссылок."""
+        root = os.path.join(settings.MEDIA_ROOT, directory)
+        if not os.path.isdir(root):
+            return
+        for entry in walk(root):
+            self.scanned += 1
+            name = os.path.relpath(entry.path, settings.MEDIA_ROOT).replace(
+                os.sep, '/'
+            )
+            stat = entry.stat(follow_symlinks=False)
+            if not is_referenced(name) and stat.st_mtime < self.newest:
+                self.orphans += 1
+                self.freed += stat.st_size
+                if options['dry_run']:
+                    self.stdout.write(f'  {name}')
+                else:
+                    delete(name)
+            if self.scanned % options['progress'] == 0:
+                self.stdout.write(
+                    f'Просмотрено: {self.scanned}, сирот: {self.orphans}, '
+                    f'{self.freed // 1024} КБ'
+                )
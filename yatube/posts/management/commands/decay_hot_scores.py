@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.ranking import decay
+
+
+class Command(BaseCommand):
+    help = 'Применяет затухание к рейтингам популярных постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=float,
+            default=settings.HOT_DECAY_INTERVAL_HOURS,
+            help='Сколько часов прошло с прошлого запуска.',
+        )
+
+    def handle(self, *args, **options):
+        updated = decay(options['hours'])
+        self.stdout.write(f'Обновлено рейтингов: {updated}')
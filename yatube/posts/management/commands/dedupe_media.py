@@ -0,0 +1,64 @@
+import os
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from sorl.thumbnail import delete as delete_with_thumbnails
+
+from core.storage import content_hash, content_name
+from posts.models import ArchivedPost, Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит картинки постов по путям от хэша содержимого, '
+        'удаляя дубликаты и обновляя ссылки в постах.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать, что будет сделано.',
+        )
+
+    def files(self, root):
+        for directory, _, names in os.walk(root):
+            for name in names:
+                path = os.path.join(directory, name)
+                yield os.path.relpath(path, settings.MEDIA_ROOT).replace(
+                    os.sep, '/'
+                )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        root = os.path.join(settings.MEDIA_ROOT, 'posts')
+        moved = duplicates = 0
+        for name in self.files(root):
+            with open(default_storage.path(name), 'rb') as handle:
+                target = content_name(name, content_hash(File(handle)))
+            if target == name:
+                continue
+            if default_storage.exists(target):
+                duplicates += 1
+            else:
+                moved += 1
+            if dry_run:
+                continue
+            if default_storage.exists(target):
+                os.remove(default_storage.path(name))
+            else:
+                os.makedirs(
+                    os.path.dirname(default_storage.path(target)),
+                    exist_ok=True,
+                )
+                os.replace(
+                    default_storage.path(name), default_storage.path(target)
+                )
+            Post.objects.filter(image=name).update(image=target)
+            ArchivedPost.objects.filter(image=name).update(image=target)
+            delete_with_thumbnails(name, delete_file=False)
+        self.stdout.write(
+            f'Перенесено файлов: {moved}, удалено дубликатов: {duplicates}'
+        )
@@ -0,0 +1,118 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts import moderation
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Массово удаляет или переносит посты, комментарии и подписки '
+        'по автору, группе и периоду.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--author', help='Имя пользователя автора.')
+        parser.add_argument('--group', help='Слаг группы постов.')
+        parser.add_argument(
+            '--since', help='Начало периода, например 2023-02-01T00:00.'
+        )
+        parser.add_argument('--until', help='Конец периода.')
+        parser.add_argument(
+            '--objects',
+            nargs='+',
+            choices=('posts', 'comments', 'follows'),
+            default=['posts'],
+            help='Что обрабатывать.',
+        )
+        parser.add_argument(
+            '--move-to-group',
+            metavar='SLUG',
+            help='Перенести посты в группу вместо удаления; '
+                 'пустая строка убирает группу.',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Обработать все объекты без фильтров.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.MODERATION_BATCH_SIZE,
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только посчитать, ничего не менять.',
+        )
+
+    def parse_date(self, value):
+        if value is None:
+            return None
+        date = parse_datetime(value)
+        if date is None:
+            raise CommandError(f'Неверная дата: {value}')
+        if timezone.is_naive(date):
+            date = timezone.make_aware(date)
+        return date
+
+    def querysets(self, options):
+        since = self.parse_date(options['since'])
+        until = self.parse_date(options['until'])
+        filters = {
+            'posts': (Post.objects.all(), 'author', 'pub_date'),
+            'comments': (Comment.objects.all(), 'author', 'created'),
+            'follows': (Follow.objects.all(), 'user', None),
+        }
+        for name in options['objects']:
+            queryset, author_field, date_field = filters[name]
+            if options['author']:
+                queryset = queryset.filter(
+                    **{f'{author_field}__username': options['author']}
+                )
+            if options['group']:
+                if name == 'follows':
+                    raise CommandError('У подписок нет группы.')
+                group_field = 'group' if name == 'posts' else 'post__group'
+                queryset = queryset.filter(
+                    **{f'{group_field}__slug': options['group']}
+                )
+            if date_field and since:
+                queryset = queryset.filter(**{f'{date_field}__gte': since})
+            if date_field and until:
+                queryset = queryset.filter(**{f'{date_field}__lt': until})
+            if not queryset.query.where and not options['all']:
+                raise CommandError(
+                    f'Для {name} не задан ни один фильтр; чтобы '
+                    f'обработать все объекты, передайте --all.'
+                )
+            yield name, queryset
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        target = options['move_to_group']
+        if target is not None and options['objects'] != ['posts']:
+            raise CommandError('Переносить в группу можно только посты.')
+        group = None
+        if target:
+            group = Group.objects.filter(slug=target).first()
+            if group is None:
+                raise CommandError(f'Группа {target} не найдена.')
+        # Все аргументы проверяются до того, как что-то будет изменено.
+        querysets = list(self.querysets(options))
+        for name, queryset in querysets:
+            if options['dry_run']:
+                self.stdout.write(f'{name}: {queryset.count()}')
+                continue
+            if target is not None:
+                done = moderation.reassign_posts(queryset, group, batch_size)
+            else:
+                purge = getattr(moderation, f'purge_{name}')
+                done = purge(queryset, batch_size)
+            self.stdout.write(f'{name}: {done}')
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from posts.digests import send_digests
+
+
+class Command(BaseCommand):
+    help = 'Рассылает подписчикам дайджест новых постов их авторов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Сколько подписчиков обрабатывать за один проход.',
+        )
+
+    def handle(self, *args, **options):
+        sent = send_digests(batch_size=options['batch_size'])
+        self.stdout.write(f'Отправлено дайджестов: {sent}')
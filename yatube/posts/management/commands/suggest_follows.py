@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import suggestions
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает рекомендации «кого почитать» по графу подписок. '
+        'Нужны numpy и scipy.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count', type=int, default=settings.SUGGESTIONS_COUNT
+        )
+        parser.add_argument(
+            '--co-follow-weight',
+            type=float,
+            default=settings.SUGGESTIONS_CO_FOLLOW_WEIGHT,
+        )
+        parser.add_argument(
+            '--max-followers',
+            type=int,
+            default=settings.SUGGESTIONS_MAX_FOLLOWERS,
+        )
+        parser.add_argument(
+            '--similar',
+            type=int,
+            default=settings.SUGGESTIONS_SIMILAR,
+        )
+        parser.add_argument(
+            '--block', type=int, default=settings.SUGGESTIONS_BLOCK
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.SUGGESTIONS_BATCH_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        if suggestions.sparse is None:
+            raise CommandError('Установите numpy и scipy.')
+        total = suggestions.rebuild(
+            options['count'],
+            options['co_follow_weight'],
+            options['max_followers'],
+            options['similar'],
+            options['block'],
+            options['batch_size'],
+        )
+        self.stdout.write(f'Сохранено рекомендаций: {total}')
@@ -0,0 +1,49 @@
+"""Учёт ссылок на картинки постов.
+
+Одинаковые картинки хранятся одним файлом (см.
+core.storage.ContentAddressedStorage), поэтому файл удаляется,
+только когда на него не ссылается ни один пост, в том числе
+архивный. Ссылки считаются по индексу на поле image.
+
+Файл моложе MEDIA_RELEASE_GRACE секунд не удаляется: его может
+переиспользовать пост, который ещё не закоммичен. Такие файлы
+потом убирает collect_media_garbage.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from sorl.thumbnail import delete as delete_with_thumbnails
+
+from .models import ArchivedPost, Post
+
+
+def is_referenced(name):
+    return (
+        Post.objects.filter(image=name).exists()
+        or ArchivedPost.objects.filter(image=name).exists()
+    )
+
+
+def is_young(name):
+    grace = timedelta(seconds=settings.MEDIA_RELEASE_GRACE)
+    try:
+        modified = default_storage.get_modified_time(name)
+    except FileNotFoundError:
+        return False
+    return modified > timezone.now() - grace
+
+
+def release(names):
+    """Удаляет файлы и их миниатюры, на которые больше нет ссылок."""
+    for name in set(names):
+        if name and not is_referenced(name) and not is_young(name):
+            delete_with_thumbnails(name)
+
+
+def release_on_commit(names):
+    names = [name for name in names if name]
+    if names:
+        transaction.on_commit(lambda: release(names))
@@ -0,0 +1,14 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:55
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_auto_20230118_2331'),
+        ('posts', '0013_auto_20230212_1038'),
+    ]
+
+    operations = [
+    ]
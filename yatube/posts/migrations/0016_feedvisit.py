@@ -0,0 +1,36 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0015_digest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedVisit',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('visited', models.DateTimeField(verbose_name='Последний визит')),
+            ],
+            options={
+                'verbose_name': 'Визит в ленту подписок',
+                'verbose_name_plural': 'Визиты в ленту подписок',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-pub_date'], name='posts_post_author__7827da_idx'),
+        ),
+        migrations.AddField(
+            model_name='feedvisit',
+            name='user',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='feed_visit', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
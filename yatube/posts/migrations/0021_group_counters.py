@@ -0,0 +1,47 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:02
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_group_counters(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    Post = apps.get_model('posts', 'Post')
+    stats = (
+        Post.objects.filter(group=OuterRef('pk'))
+        .order_by().values('group')
+    )
+    Group.objects.update(
+        post_count=Coalesce(Subquery(
+            stats.annotate(count=Count('pk')).values('count')
+        ), 0),
+        last_post_date=Subquery(
+            stats.annotate(last=Max('pub_date')).values('last')
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0020_post_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='last_post_date',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Дата последнего поста'),
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Число постов'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['group', '-pub_date'], name='posts_post_group_i_1fdac4_idx'),
+        ),
+        migrations.RunPython(fill_group_counters, migrations.RunPython.noop),
+    ]
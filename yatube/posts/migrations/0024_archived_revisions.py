@@ -0,0 +1,31 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0023_suggestions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedPostRevision',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField(verbose_name='Номер версии')),
+                ('delta', models.TextField(blank=True, verbose_name='Разность')),
+                ('snapshot', models.TextField(blank=True, null=True, verbose_name='Полный текст')),
+                ('created', models.DateTimeField(verbose_name='Дата правки')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='posts.ArchivedPost')),
+            ],
+            options={
+                'verbose_name': 'Версия архивного поста',
+                'verbose_name_plural': 'Версии архивных постов',
+                'ordering': ['post', 'number'],
+                'unique_together': {('post', 'number')},
+            },
+        ),
+    ]
@@ -31,10 +31,39 @@ class Post(CreatedModel):
         'Картинка',
         upload_to='posts/',
         blank=True,
+        db_index=True,
+    )
+    updated = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True,
+        db_index=True
+    )
+    score = models.FloatField(
+        'Рейтинг',
+        default=0,
+        db_index=True
+    )
+    tags = models.ManyToManyField(
+        'Tag',
+        blank=True,
+        related_name='posts',
+        verbose_name='Хэштеги'
+    )
+    mentions = models.ManyToManyField(
+        User,
+        blank=True,
+        related_name='mentioned_in',
+        verbose_name='Упоминания'
     )
 
+    is_archived = False
+
     class Meta:
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(fields=['author', '-pub_date']),
+            models.Index(fields=['group', '-pub_date']),
+        ]
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
 
@@ -46,6 +75,16 @@ class Group(models.Model):
     title = models.CharField(max_length=200, verbose_name='Название')
     slug = models.SlugField(unique=True, verbose_name='URL')
     description = models.TextField(verbose_name='Описание')
+    post_count = models.PositiveIntegerField(
+        verbose_name='Число постов',
+        default=0
+    )
+    last_post_date = models.DateTimeField(
+        verbose_name='Дата последнего поста',
+        blank=True,
+        null=True,
+        db_index=True
+    )
 
     class Meta:
         verbose_name = 'Группа'
@@ -55,6 +94,21 @@ class Group(models.Model):
         return self.title
 
 
+class Tag(models.Model):
+    name = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name='Хэштег'
+    )
+
+    class Meta:
+        verbose_name = 'Хэштег'
+        verbose_name_plural = 'Хэштеги'
+
+    def __str__(self):
+        return f'#{self.name}'
+
+
 class Comment(models.Model):
     post = models.ForeignKey(
         Post,
@@ -94,3 +148,186 @@ class Follow(models.Model):
         related_name='following',
         on_delete=models.CASCADE
     )
+
+
+class Digest(models.Model):
+    """Рассылка дайджестов подписчикам за период."""
+    until = models.DateTimeField(
+        verbose_name='Конец периода',
+        db_index=True
+    )
+    sent = models.PositiveIntegerField(
+        verbose_name='Отправлено писем',
+        default=0
+    )
+
+    class Meta:
+        ordering = ['-until']
+        verbose_name = 'Дайджест'
+        verbose_name_plural = 'Дайджесты'
+
+    def __str__(self):
+        return f'{self.until:%d.%m.%Y %H:%M} ({self.sent})'
+
+
+class FeedVisit(models.Model):
+    """Когда пользователь последний раз открывал ленту подписок."""
+    user = models.OneToOneField(
+        User,
+        related_name='feed_visit',
+        on_delete=models.CASCADE
+    )
+    visited = models.DateTimeField(verbose_name='Последний визит')
+
+    class Meta:
+        verbose_name = 'Визит в ленту подписок'
+        verbose_name_plural = 'Визиты в ленту подписок'
+
+
+class PostRevision(models.Model):
+    """Прежняя версия текста поста.
+
+    Хранится разностью до следующей версии, каждая
+    POST_SNAPSHOT_EVERY-я версия хранится целиком.
+    """
+    post = models.ForeignKey(
+        Post,
+        related_name='revisions',
+        on_delete=models.CASCADE
+    )
+    number = models.PositiveIntegerField(verbose_name='Номер версии')
+    delta = models.TextField(verbose_name='Разность', blank=True)
+    snapshot = models.TextField(
+        verbose_name='Полный текст',
+        blank=True,
+        null=True
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата правки'
+    )
+
+    class Meta:
+        ordering = ['post', 'number']
+        unique_together = ['post', 'number']
+        verbose_name = 'Версия поста'
+        verbose_name_plural = 'Версии постов'
+
+    def __str__(self):
+        return f'{self.post_id} v{self.number}'
+
+
+class ArchivedPost(models.Model):
+    """Старый пост, перенесённый из основной таблицы в архив."""
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField(verbose_name='Текст')
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts',
+        verbose_name='Автор поста, постов'
+    )
+    group = models.ForeignKey(
+        Group,
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='archived_posts',
+        verbose_name='Группа поста, постов'
+    )
+    image = models.ImageField(
+        'Картинка',
+        upload_to='posts/',
+        blank=True,
+        db_index=True,
+    )
+    pub_date = models.DateTimeField('Дата создания', db_index=True)
+    updated = models.DateTimeField('Дата изменения')
+
+    is_archived = True
+
+    class Meta:
+        ordering = ['-pub_date']
+        verbose_name = 'Архивный пост'
+        verbose_name_plural = 'Архивные посты'
+
+    def __str__(self):
+        return self.text[:settings.INTRODUCTION]
+
+
+class ArchivedComment(models.Model):
+    """Комментарий к архивному посту."""
+    id = models.IntegerField(primary_key=True)
+    post = models.ForeignKey(
+        ArchivedPost,
+        related_name='comments',
+        on_delete=models.CASCADE
+    )
+    author = models.ForeignKey(
+        User,
+        related_name='archived_comments',
+        on_delete=models.CASCADE
+    )
+    text = models.TextField(verbose_name='Текст комментария')
+    created = models.DateTimeField(verbose_name='Дата комментария')
+
+    class Meta:
+        ordering = ['created']
+        verbose_name = 'Архивный комментарий'
+        verbose_name_plural = 'Архивные комментарии'
+
+    def __str__(self):
+        return self.text[:settings.INTRODUCTION]
+
+
+class ArchivedPostRevision(models.Model):
+    """Прежняя версия текста архивного поста, см. PostRevision."""
+    post = models.ForeignKey(
+        ArchivedPost,
+        related_name='revisions',
+        on_delete=models.CASCADE
+    )
+    number = models.PositiveIntegerField(verbose_name='Номер версии')
+    delta = models.TextField(verbose_name='Разность', blank=True)
+    snapshot = models.TextField(
+        verbose_name='Полный текст',
+        blank=True,
+        null=True
+    )
+    created = models.DateTimeField(verbose_name='Дата правки')
+
+    class Meta:
+        ordering = ['post', 'number']
+        unique_together = ['post', 'number']
+        verbose_name = 'Версия архивного поста'
+        verbose_name_plural = 'Версии архивных постов'
+
+    def __str__(self):
+        return f'{self.post_id} v{self.number}'
+
+
+class Suggestion(models.Model):
+    """Автор, на которого стоит подписаться пользователю.
+
+    Таблица целиком пересчитывается командой suggest_follows.
+    """
+    user = models.ForeignKey(
+        User,
+        related_name='suggestions',
+        on_delete=models.CASCADE
+    )
+    author = models.ForeignKey(
+        User,
+        related_name='suggested_to',
+        on_delete=models.CASCADE
+    )
+    score = models.FloatField(verbose_name='Вес рекомендации')
+
+    class Meta:
+        ordering = ['user', '-score']
+        unique_together = ['user', 'author']
+        verbose_name = 'Рекомендация подписки'
+        verbose_name_plural = 'Рекомендации подписок'
+
+    def __str__(self):
+        return f'{self.user_id} → {self.author_id}'
@@ -0,0 +1,114 @@
+"""Массовая модерация: удаление и перенос постов, комментариев и подписок.
+
+Всё делается пачками по batch_size строк, каждая пачка в своей
+короткой транзакции. Удаляет сборщик Django, но пообъектные
+обработчики отключены (signals.bulk_changes). Счётчики групп и рейтинги
+поправляются агрегатно, кэш числа постов в пагинаторе
+сбрасывается, картинки без других ссылок и их миниатюры удаляются
+после коммита.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Max
+
+from . import counters, following, ranking
+from .media import release_on_commit
+from .models import Comment, Follow, Post
+from .signals import bulk_changes
+from .unread import forget_followers_unread, forget_unread
+from .utils import bump_count_version
+
+
+def _batches(queryset, batch_size):
+    """Пачки id из queryset; каждая обрабатывается и исчезает из выборки."""
+    while True:
+        ids = list(
+            queryset.order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return
+        yield ids
+
+
+def purge_posts(queryset, batch_size):
+    """Удаляет посты вместе с комментариями, историей и связями."""
+    total = 0
+    for ids in _batches(queryset, batch_size):
+        with transaction.atomic():
+            posts = Post.objects.filter(pk__in=ids)
+            images = list(
+                posts.exclude(image='').values_list('image', flat=True)
+            )
+            groups = Counter(
+                posts.exclude(group=None).values_list('group_id', flat=True)
+            )
+            authors = set(posts.values_list('author_id', flat=True))
+            with bulk_changes():
+                posts.delete()
+            for group_id, count in groups.items():
+                counters.posts_removed(group_id, count)
+            release_on_commit(images)
+            transaction.on_commit(
+                lambda authors=authors: forget_followers_unread(*authors)
+            )
+        total += len(ids)
+    bump_count_version(Post)
+    return total
+
+
+def reassign_posts(queryset, group, batch_size):
+    """Переносит посты в группу group (None — убрать из группы)."""
+    group_id = group.pk if group else None
+    total = 0
+    queryset = queryset.exclude(group_id=group_id) if group_id else (
+        queryset.exclude(group=None)
+    )
+    for ids in _batches(queryset, batch_size):
+        with transaction.atomic():
+            posts = Post.objects.filter(pk__in=ids)
+            groups = Counter(
+                posts.exclude(group=None).values_list('group_id', flat=True)
+            )
+            last = posts.aggregate(last=Max('pub_date'))['last']
+            posts.update(group_id=group_id)
+            for old_group_id, count in groups.items():
+                counters.posts_removed(old_group_id, count)
+            if group_id:
+                counters.posts_added(group_id, last, len(ids))
+        total += len(ids)
+    bump_count_version(Post)
+    return total
+
+
+def purge_comments(queryset, batch_size):
+    total = 0
+    for ids in _batches(queryset, batch_size):
+        with transaction.atomic():
+            comments = Comment.objects.filter(pk__in=ids)
+            posts = Counter(comments.values_list('post_id', flat=True))
+            with bulk_changes():
+                comments.delete()
+            for post_id, count in posts.items():
+                ranking.change_comments(post_id, -count)
+        total += len(ids)
+    return total
+
+
+def purge_follows(queryset, batch_size):
+    total = 0
+    for ids in _batches(queryset, batch_size):
+        with transaction.atomic():
+            follows = Follow.objects.filter(pk__in=ids)
+            pairs = list(follows.values_list('user_id', 'author_id'))
+            authors = Counter(author_id for _, author_id in pairs)
+            with bulk_changes():
+                follows.delete()
+            for author_id, count in authors.items():
+                ranking.change_reach(author_id, -count)
+            users = {user_id for user_id, _ in pairs}
+            following.forget(*users)
+            forget_unread(*users)
+        total += len(ids)
+    bump_count_version(Follow)
+    return total
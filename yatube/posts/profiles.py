@@ -0,0 +1,50 @@
+"""Данные страницы профиля.
+
+Автор загружается одним запросом вместе с числом постов, которое
+затем передаётся пагинатору, чтобы не считать посты второй раз.
+Подписка зрителя на автора проверяется подзапросом в том же
+запросе, без кэша, который в другом воркере мог устареть.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models import (
+    BooleanField, Count, Exists, IntegerField, OuterRef, Subquery, Value
+)
+from django.db.models.functions import Coalesce
+from django.shortcuts import get_object_or_404
+
+from .models import Follow, Post
+
+User = get_user_model()
+
+
+def post_count_subquery():
+    return Coalesce(
+        Subquery(
+            Post.objects.filter(author=OuterRef('pk'))
+            .order_by()
+            .values('author')
+            .annotate(count=Count('pk'))
+            .values('count'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def load_profile(username, viewer):
+    """Автор с post_count и followed_by_viewer и queryset его постов."""
+    if viewer.is_authenticated:
+        followed = Exists(
+            Follow.objects.filter(user=viewer.pk, author=OuterRef('pk'))
+        )
+    else:
+        followed = Value(False, output_field=BooleanField())
+    author = get_object_or_404(
+        User.objects.annotate(
+            post_count=post_count_subquery(), followed_by_viewer=followed
+        ),
+        username=username,
+    )
+    # Менеджер author.posts сам проставляет post.author = author.
+    posts = author.posts.select_related('group')
+    return author, posts
@@ -0,0 +1,85 @@
+"""Рейтинг популярных постов.
+
+Рейтинг хранится в индексированном поле Post.score и меняется
+на месте: новый комментарий и новый подписчик автора прибавляют
+свой вес, а периодическая команда decay_hot_scores умножает все
+рейтинги на коэффициент затухания. Лента популярного — выборка
+по индексу рейтинга.
+
+Меняются только посты внутри окна HOT_WINDOW_DAYS: старый пост
+не возвращается в ленту от нового комментария. Вычитаемый вес
+не затухал вместе с рейтингом, поэтому результат вычитания
+не опускается ниже SCORE_FLOOR и пост остаётся в ленте до конца
+окна.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import Post
+from .utils import bump_count_version
+
+SCORE_FLOOR = 1e-6
+
+
+def hot_window_start():
+    return timezone.now() - timedelta(days=settings.HOT_WINDOW_DAYS)
+
+
+def initial_score(author):
+    """Рейтинг нового поста: базовый вес плюс охват подписчиков."""
+    followers = author.following.count()
+    return 1 + followers * settings.HOT_FOLLOWER_WEIGHT
+
+
+def _shift(posts, weight):
+    """Сдвигает рейтинг свежих постов на weight."""
+    score = F('score') + weight
+    if weight < 0:
+        score = Greatest(score, SCORE_FLOOR)
+    return posts.filter(
+        pub_date__gte=hot_window_start(), score__gt=0
+    ).update(score=score)
+
+
+def change_comments(post_id, comments):
+    """Учитывает добавленные или удалённые комментарии поста."""
+    _shift(
+        Post.objects.filter(pk=post_id),
+        comments * settings.HOT_COMMENT_WEIGHT
+    )
+
+
+def add_comment(post_id):
+    change_comments(post_id, 1)
+
+
+def change_reach(author_id, followers):
+    """Учитывает изменение числа подписчиков в свежих постах автора."""
+    _shift(
+        Post.objects.filter(author_id=author_id),
+        followers * settings.HOT_FOLLOWER_WEIGHT
+    )
+
+
+def decay(hours):
+    """Затухание рейтингов за прошедшие hours часов.
+
+    Посты старше окна HOT_WINDOW_DAYS выпадают из ленты.
+    Возвращает число обновлённых постов.
+    """
+    factor = 0.5 ** (hours / settings.HOT_HALF_LIFE_HOURS)
+    start = hot_window_start()
+    if Post.objects.filter(score__gt=0, pub_date__lt=start).update(score=0):
+        # Лента популярного стала короче.
+        bump_count_version(Post)
+    return Post.objects.filter(score__gt=0).update(
+        score=F('score') * factor
+    )
+
+
+def hot_posts():
+    return Post.objects.filter(score__gt=0).order_by('-score', '-pub_date')
@@ -0,0 +1,161 @@
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.db import transaction
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_save
+)
+from django.dispatch import receiver
+
+from .live import comment_event, get_broker
+from . import counters, following, ranking
+from .media import release_on_commit
+from .models import Comment, Follow, Group, Post
+from .tags import sync_post
+from .unread import forget_followers_unread, forget_unread
+from .utils import bump_count_version
+
+_local = threading.local()
+
+
+@contextmanager
+def bulk_changes():
+    """Отключает пообъектные обработчики на время массовой операции.
+
+    Каскады по-прежнему выполняет сборщик Django, а счётчики групп,
+    рейтинги и кэши вызывающий код поправляет сам, агрегатно.
+    """
+    _local.bulk = True
+    try:
+        yield
+    finally:
+        _local.bulk = False
+
+
+def per_object(handler):
+    @wraps(handler)
+    def wrapper(*args, **kwargs):
+        if not getattr(_local, 'bulk', False):
+            return handler(*args, **kwargs)
+    return wrapper
+
+
+@receiver(post_save, sender=Comment)
+def publish_comment(sender, instance, created, **kwargs):
+    """Отправляет новый комментарий зрителям поста после коммита."""
+    if not created:
+        return
+    event = comment_event(instance)
+    transaction.on_commit(
+        lambda: get_broker().publish(instance.post_id, event)
+    )
+
+
+@receiver(post_save, sender=Post)
+def sync_post_tags(sender, instance, raw, **kwargs):
+    """Обновляет хэштеги и упоминания после сохранения поста."""
+    if not raw:
+        sync_post(instance)
+
+
+@receiver(pre_save, sender=Post)
+def set_initial_score(sender, instance, raw, **kwargs):
+    if instance._state.adding and not raw:
+        instance.score = ranking.initial_score(instance.author)
+
+
+@receiver(post_save, sender=Comment)
+def score_comment(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        ranking.add_comment(instance.post_id)
+
+
+@receiver(post_delete, sender=Comment)
+@per_object
+def unscore_comment(sender, instance, **kwargs):
+    ranking.change_comments(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Follow)
+def score_follow(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        ranking.change_reach(instance.author_id, 1)
+
+
+@receiver(post_delete, sender=Follow)
+@per_object
+def score_unfollow(sender, instance, **kwargs):
+    ranking.change_reach(instance.author_id, -1)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+@per_object
+def forget_followed(sender, instance, **kwargs):
+    following.forget(instance.user_id)
+    forget_unread(instance.user_id)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@per_object
+def forget_followers_unread_count(sender, instance, **kwargs):
+    """Новый или удалённый пост меняет счётчики подписчиков автора."""
+    if kwargs.get('created', True) and not kwargs.get('raw'):
+        author_id = instance.author_id
+        transaction.on_commit(lambda: forget_followers_unread(author_id))
+
+
+@receiver(post_init, sender=Post)
+def remember_initial(sender, instance, **kwargs):
+    instance._initial_group_id = instance.__dict__.get('group_id')
+    image = instance.__dict__.get('image')
+    instance._initial_image = getattr(image, 'name', image) or None
+
+
+@receiver(post_save, sender=Post)
+def count_group_posts(sender, instance, created, raw, **kwargs):
+    """Обновляет счётчики групп при создании поста и смене группы."""
+    if raw:
+        return
+    old_group_id = None if created else instance._initial_group_id
+    if old_group_id != instance.group_id:
+        if old_group_id is not None:
+            counters.posts_removed(old_group_id)
+        if instance.group_id is not None:
+            counters.posts_added(instance.group_id, instance.pub_date)
+    instance._initial_group_id = instance.group_id
+
+
+@receiver(post_delete, sender=Post)
+@per_object
+def uncount_group_post(sender, instance, **kwargs):
+    if instance.group_id is not None:
+        counters.posts_removed(instance.group_id)
+
+
+@receiver(post_save, sender=Post)
+def release_replaced_image(sender, instance, created, raw, **kwargs):
+    """Освобождает прежнюю картинку поста после её замены."""
+    old_image = instance._initial_image
+    instance._initial_image = instance.image.name or None
+    if not created and not raw and old_image != instance._initial_image:
+        release_on_commit([old_image])
+
+
+@receiver(post_delete, sender=Post)
+@per_object
+def release_deleted_image(sender, instance, **kwargs):
+    release_on_commit([instance.image.name])
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+@per_object
+def expire_page_counts(sender, **kwargs):
+    bump_count_version(sender)
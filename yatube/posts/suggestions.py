@@ -0,0 +1,180 @@
+"""Рекомендации «кого почитать» по графу подписок.
+
+Граф загружается в разреженную матрицу CSR: строка — читатель,
+столбец — автор, поэтому на подписку уходит 8 байт индексов и
+4 байта веса. Вес кандидата складывается из двух слагаемых:
+
+* друзья друзей — авторы, на которых подписаны мои авторы
+  (строки A @ A);
+* соподписчики — авторы, которых читают люди с похожими на мои
+  подписками ((A' @ A'.T) @ A). В A' оставлены только авторы
+  не больше чем с SUGGESTIONS_MAX_FOLLOWERS подписчиками:
+  подписка на звезду мало говорит о вкусах, а её столбец сделал
+  бы произведение почти плотным. Из похожих читателей берутся
+  SUGGESTIONS_SIMILAR самых близких.
+
+Читатели обрабатываются блоками по SUGGESTIONS_BLOCK строк, так что
+память на промежуточные произведения ограничена размером блока.
+Для каждой строки остаются SUGGESTIONS_COUNT лучших кандидатов,
+отбор лучших векторизован сортировкой всех элементов блока.
+
+numpy и scipy — необязательные зависимости, они нужны только
+команде suggest_follows.
+"""
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Max
+
+from .following import MAX_IN_IDS, cached_followed_ids
+from .models import Follow, Suggestion
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    np = sparse = None
+
+User = get_user_model()
+
+
+def load_graph(batch_size):
+    """Матрица подписок размером (max id + 1) × (max id + 1)."""
+    size = (User.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+    edges = (
+        Follow.objects.order_by()
+        .values_list('user_id', 'author_id')
+        .iterator(chunk_size=batch_size)
+    )
+    chunks = []
+    while True:
+        chunk = list(islice(edges, batch_size))
+        if not chunk:
+            break
+        chunks.append(np.array(chunk, dtype=np.int32))
+    pairs = (np.concatenate(chunks) if chunks
+             else np.empty((0, 2), dtype=np.int32))
+    graph = sparse.csr_matrix(
+        (np.ones(len(pairs), dtype=np.float32), (pairs[:, 0], pairs[:, 1])),
+        shape=(size, size),
+    )
+    # Повторные подписки не должны давать лишний вес.
+    graph.data[:] = 1
+    return graph
+
+
+def ranked(matrix, count):
+    """Лучшие count элементов каждой строки без цикла по строкам.
+
+    Возвращает массивы строк, столбцов и весов, упорядоченные по
+    строке и убыванию веса.
+    """
+    matrix = sparse.csr_matrix(matrix)
+    matrix.eliminate_zeros()
+    rows = np.repeat(
+        np.arange(matrix.shape[0], dtype=np.int32), np.diff(matrix.indptr)
+    )
+    order = np.lexsort((matrix.indices, -matrix.data, rows))
+    rank = np.arange(len(order)) - matrix.indptr[rows[order]]
+    keep = order[rank < count]
+    return rows[keep], matrix.indices[keep], matrix.data[keep]
+
+
+def keep_top(matrix, count):
+    rows, columns, data = ranked(matrix, count)
+    return sparse.csr_matrix((data, (rows, columns)), shape=matrix.shape)
+
+
+def compute(graph, count, co_follow_weight, max_followers, similar_count,
+            block):
+    """Рекомендации по блокам читателей.
+
+    Отдаёт пары (range id читателей блока, {id читателя: список
+    (id автора, вес)}).
+    """
+    size = graph.shape[0]
+    followers = np.asarray(graph.sum(axis=0)).ravel()
+    niche = graph @ sparse.diags(
+        (followers <= max_followers).astype(np.float32)
+    )
+    niche_t = niche.T.tocsr()
+    for start in range(0, size, block):
+        stop = min(start + block, size)
+        rows = graph[start:stop]
+        if rows.nnz == 0:
+            yield range(start, stop), {}
+            continue
+        scores = rows @ graph
+        if co_follow_weight:
+            similar = niche[start:stop] @ niche_t
+            # Сам читатель не считается похожим на себя.
+            similar.setdiag(0, k=start)
+            similar = keep_top(similar, similar_count)
+            scores = scores + co_follow_weight * (similar @ graph)
+        own = sparse.csr_matrix(
+            (np.ones(stop - start, dtype=np.float32),
+             (np.arange(stop - start), np.arange(start, stop))),
+            shape=scores.shape,
+        )
+        # Уже прочитанные авторы и сам читатель не рекомендуются.
+        scores = scores - scores.multiply(rows) - scores.multiply(own)
+        suggestions = {}
+        for row, column, score in zip(
+                *(array.tolist() for array in ranked(scores, count))):
+            suggestions.setdefault(start + row, []).append((column, score))
+        yield range(start, stop), suggestions
+
+
+def store(user_range, suggestions, batch_size):
+    """Заменяет рекомендации читателей из user_range."""
+    with transaction.atomic():
+        Suggestion.objects.filter(
+            user_id__gte=user_range.start, user_id__lt=user_range.stop
+        ).delete()
+        Suggestion.objects.bulk_create(
+            [
+                Suggestion(user_id=user_id, author_id=author_id, score=score)
+                for user_id, best in suggestions.items()
+                for author_id, score in best
+            ],
+            batch_size=batch_size,
+        )
+
+
+def rebuild(count, co_follow_weight, max_followers, similar_count, block,
+            batch_size):
+    """Пересчитывает все рекомендации. Возвращает число записей."""
+    graph = load_graph(batch_size)
+    total = 0
+    for user_range, suggestions in compute(
+            graph, count, co_follow_weight, max_followers, similar_count,
+            block):
+        store(user_range, suggestions, batch_size)
+        total += sum(len(best) for best in suggestions.values())
+    Suggestion.objects.filter(user_id__gte=graph.shape[0]).delete()
+    return total
+
+
+def suggestions_for(user, exclude=None):
+    """Рекомендованные авторы без тех, на кого user уже подписался.
+
+    exclude — автор, чей профиль сейчас открыт.
+    """
+    if not user.is_authenticated:
+        return []
+    suggestions = Suggestion.objects.filter(user=user)
+    followed = cached_followed_ids(user)
+    if followed is None or len(followed) > MAX_IN_IDS:
+        suggestions = suggestions.exclude(author__following__user=user)
+    elif followed:
+        suggestions = suggestions.exclude(author_id__in=followed)
+    if exclude is not None:
+        suggestions = suggestions.exclude(author_id=exclude.pk)
+    return [
+        suggestion.author
+        for suggestion in suggestions.select_related('author')[
+            :settings.SUGGESTIONS_SHOWN
+        ]
+    ]
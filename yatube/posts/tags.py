@@ -0,0 +1,115 @@
+"""Хэштеги и упоминания в тексте постов.
+
+Теги и упоминания раскладываются в связующие таблицы, поэтому
+лента тега — выборка по индексу, а не поиск по тексту.
+"""
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+
+from .models import Post, Tag
+from .utils import bump_count_version
+
+User = get_user_model()
+
+TAG_RE = re.compile(r'(?<![\w&])#(\w{1,100})')
+MENTION_RE = re.compile(r'(?<![\w@])@([\w.+-]{1,150})')
+
+PostTag = Post.tags.through
+PostMention = Post.mentions.through
+
+
+def extract(text):
+    """Хэштеги в нижнем регистре и имена упомянутых пользователей."""
+    tags = {name.lower() for name in TAG_RE.findall(text)}
+    mentions = {name.rstrip('.') for name in MENTION_RE.findall(text)}
+    return tags, mentions
+
+
+def tag_ids(names):
+    """id тегов по именам, недостающие теги создаются."""
+    if not names:
+        return {}
+    Tag.objects.bulk_create(
+        [Tag(name=name) for name in names], ignore_conflicts=True
+    )
+    return dict(
+        Tag.objects.filter(name__in=names).values_list('name', 'pk')
+    )
+
+
+def user_ids(usernames):
+    if not usernames:
+        return {}
+    return dict(
+        User.objects.filter(username__in=usernames)
+        .values_list('username', 'pk')
+    )
+
+
+def sync_post(post):
+    """Приводит теги и упоминания поста в соответствие с текстом."""
+    tags, mentions = extract(post.text)
+    post.tags.set(tag_ids(tags).values())
+    post.mentions.set(user_ids(mentions).values())
+
+
+@transaction.atomic
+def backfill_chunk(start, stop):
+    """Заполняет связи для постов с id в диапазоне [start, stop)."""
+    texts = dict(
+        Post.objects.filter(pk__gte=start, pk__lt=stop)
+        .values_list('pk', 'text')
+    )
+    extracted = {pk: extract(text) for pk, text in texts.items()}
+    tags = tag_ids(set().union(*(t for t, _ in extracted.values())))
+    users = user_ids(set().union(*(m for _, m in extracted.values())))
+    PostTag.objects.bulk_create(
+        [
+            PostTag(post_id=pk, tag_id=tags[name])
+            for pk, (names, _) in extracted.items()
+            for name in names
+        ],
+        ignore_conflicts=True,
+    )
+    PostMention.objects.bulk_create(
+        [
+            PostMention(post_id=pk, user_id=users[name])
+            for pk, (_, names) in extracted.items()
+            for name in names if name in users
+        ],
+        ignore_conflicts=True,
+    )
+    return len(texts)
+
+
+def backfill(chunk_size, workers):
+    """Заполняет теги и упоминания всех постов параллельно по диапазонам id.
+
+    Возвращает число обработанных постов.
+    """
+    last = Post.objects.order_by('-pk').values_list('pk', flat=True).first()
+    if last is None:
+        return 0
+    chunks = [
+        (start, start + chunk_size)
+        for start in range(1, last + 1, chunk_size)
+    ]
+    if workers == 1 or connection.vendor == 'sqlite':
+        # SQLite не допускает параллельной записи.
+        total = sum(backfill_chunk(*chunk) for chunk in chunks)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            total = sum(executor.map(_backfill_in_thread, chunks))
+    bump_count_version(Post.tags.through)
+    bump_count_version(Post.mentions.through)
+    return total
+
+
+def _backfill_in_thread(chunk):
+    try:
+        return backfill_chunk(*chunk)
+    finally:
+        connection.close()
@@ -0,0 +1,13 @@
+from django import template
+
+from posts.unread import count_unread
+
+register = template.Library()
+
+
+@register.simple_tag
+def unread_count(user):
+    """Число непрочитанных постов в ленте подписок."""
+    if not user.is_authenticated:
+        return 0
+    return count_unread(user)
@@ -0,0 +1,18 @@
+from django import template
+
+from posts.cards import render_card
+from posts.links import posts_url as build_posts_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card(post):
+    """Карточка поста, то же, что posts/includes/post_list.html."""
+    return render_card(post)
+
+
+@register.simple_tag
+def posts_url(name, *args):
+    """{% url 'posts:name' ... %} без обхода резолвера."""
+    return build_posts_url(name, *args)
@@ -0,0 +1,44 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class PostAdminTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@test.ru', password='Test1234'
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug', description='Описание'
+        )
+        cls.tagged = Post.objects.create(
+            author=cls.admin, text='Пост #Спам', group=cls.group
+        )
+        cls.plain = Post.objects.create(author=cls.admin, text='Спам')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_changelist_query_budget(self):
+        """Список постов не делает запросов на каждую строку."""
+        for i in range(10):
+            Post.objects.create(author=self.admin, text=f'Пост {i}')
+        url = reverse('admin:posts_post_changelist')
+        with self.assertNumQueries(5):
+            self.client.get(url)
+
+    def test_search_uses_exact_indexed_values(self):
+        """Поиск находит посты по хэштегу и слагу, а не по тексту."""
+        url = reverse('admin:posts_post_changelist')
+        for term in ('#спам', 'test-slug'):
+            with self.subTest(term=term):
+                response = self.client.get(url, {'q': term})
+                self.assertEqual(
+                    list(response.context['cl'].result_list), [self.tagged]
+                )
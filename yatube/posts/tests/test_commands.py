@@ -0,0 +1,312 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+from unittest import skipIf
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..history import record_edit, text_at
+from ..models import (
+    ArchivedPost, Comment, Digest, Follow, Group, Post, Suggestion, Tag
+)
+from ..suggestions import sparse
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+class SendDigestsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.follower = User.objects.create_user(
+            username='follower', email='follower@test.ru'
+        )
+        cls.stranger = User.objects.create_user(
+            username='stranger', email='stranger@test.ru'
+        )
+        Follow.objects.create(user=cls.follower, author=cls.author)
+        cls.post = Post.objects.create(
+            author=cls.author, text='Запись для дайджеста'
+        )
+
+    def test_digest_sent_to_followers_only(self):
+        """Дайджест получает только подписчик, одно письмо на человека."""
+        call_command('send_digests', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['follower@test.ru'])
+        self.assertIn(self.post.text, mail.outbox[0].body)
+        self.assertIn(
+            settings.SITE_URL
+            + reverse('posts:post_detail', args=[self.post.pk]),
+            mail.outbox[0].body,
+        )
+        self.assertEqual(Digest.objects.get().sent, 1)
+
+    def test_digest_not_repeated(self):
+        """Повторный запуск не присылает уже отправленные посты."""
+        call_command('send_digests', stdout=StringIO())
+        call_command('send_digests', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+
+
+class ArchivePostsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.old_post = Post.objects.create(author=cls.author, text='Старый')
+        cls.new_post = Post.objects.create(author=cls.author, text='Новый')
+        Post.objects.filter(pk=cls.old_post.pk).update(
+            pub_date=timezone.now() - timedelta(days=400)
+        )
+        Comment.objects.create(
+            post=cls.old_post, author=cls.author, text='Старый комментарий'
+        )
+
+    def test_old_posts_moved_to_archive(self):
+        """Старые посты с комментариями уезжают в архив."""
+        call_command('archive_posts', days=365, stdout=StringIO())
+        self.assertEqual(list(Post.objects.all()), [self.new_post])
+        self.assertFalse(Comment.objects.exists())
+        archived = ArchivedPost.objects.get()
+        self.assertEqual(archived.pk, self.old_post.pk)
+        self.assertEqual(archived.comments.get().text, 'Старый комментарий')
+
+    def test_archived_post_detail(self):
+        """Страница архивного поста открывается по старому адресу."""
+        call_command('archive_posts', days=365, stdout=StringIO())
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.old_post.pk})
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, 'Старый комментарий')
+
+    def test_history_and_counters_survive_archiving(self):
+        """История правок уезжает в архив, счётчик группы уменьшается."""
+        group = Group.objects.create(title='Группа', slug='archive-group')
+        post = Post.objects.create(
+            author=self.author, text='Первая версия', group=group
+        )
+        post.text = 'Вторая версия'
+        post.save()
+        record_edit(post, 'Первая версия')
+        Post.objects.filter(pk=post.pk).update(
+            pub_date=timezone.now() - timedelta(days=400)
+        )
+        call_command('archive_posts', days=365, stdout=StringIO())
+        archived = ArchivedPost.objects.get(pk=post.pk)
+        self.assertEqual(text_at(archived, 0), 'Первая версия')
+        self.assertEqual(text_at(archived, 1), 'Вторая версия')
+        group.refresh_from_db()
+        self.assertEqual(group.post_count, 0)
+        self.assertIsNone(group.last_post_date)
+
+
+class BackfillTagsTests(TestCase):
+    def test_backfill_existing_posts(self):
+        """Теги заполняются для постов, созданных в обход save()."""
+        author = User.objects.create_user(username='author')
+        Post.objects.bulk_create(
+            Post(author=author, text=f'#тег{i % 3} @author') for i in range(7)
+        )
+        call_command(
+            'backfill_tags', chunk_size=3, workers=1, stdout=StringIO()
+        )
+        self.assertEqual(Tag.objects.count(), 3)
+        self.assertEqual(Post.tags.through.objects.count(), 7)
+        self.assertEqual(author.mentioned_in.count(), 7)
+
+
+@skipIf(sparse is None, 'нужны numpy и scipy')
+class SuggestFollowsTests(TestCase):
+    def test_friends_of_friends_and_co_followers(self):
+        """Рекомендуются авторы моих авторов и похожих читателей."""
+        reader, author, other, fan, niche = [
+            User.objects.create_user(username=name)
+            for name in ('reader', 'author', 'other', 'fan', 'niche')
+        ]
+        Follow.objects.bulk_create([
+            Follow(user=reader, author=author),
+            Follow(user=author, author=other),
+            Follow(user=fan, author=author),
+            Follow(user=fan, author=niche),
+        ])
+        Suggestion.objects.create(user=fan, author=reader, score=1)
+        call_command('suggest_follows', block=2, stdout=StringIO())
+        self.assertEqual(
+            list(
+                reader.suggestions.values_list('author__username', 'score')
+            ),
+            [('other', 1.0), ('niche', 0.5)],
+        )
+        self.assertFalse(fan.suggestions.filter(author=reader).exists())
+
+        self.client.force_login(reader)
+        response = self.client.get(
+            reverse('posts:profile', args=[author.username])
+        )
+        self.assertEqual(response.context['suggestions'], [other, niche])
+
+
+class ModerateTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.spammer = User.objects.create_user(username='spammer')
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        cls.other = Group.objects.create(title='Другая', slug='other')
+
+    def setUp(self):
+        for i in range(5):
+            post = Post.objects.create(
+                author=self.spammer, text=f'Спам #spam {i}', group=self.group
+            )
+            Comment.objects.create(post=post, author=self.author, text='!')
+        self.kept = Post.objects.create(
+            author=self.author, text='Пост', group=self.group
+        )
+        Follow.objects.create(user=self.spammer, author=self.author)
+
+    def test_purge_author_posts_and_follows(self):
+        """Посты, комментарии к ним и подписки спамера удаляются пачками."""
+        call_command(
+            'moderate', author='spammer', objects=['posts', 'follows'],
+            batch_size=2, stdout=StringIO(),
+        )
+        self.assertEqual(list(Post.objects.all()), [self.kept])
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(Post.tags.through.objects.exists())
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.post_count, 1)
+
+    def test_move_posts_to_group(self):
+        """Посты переносятся в другую группу со счётчиками."""
+        call_command(
+            'moderate', author='spammer', move_to_group='other',
+            batch_size=2, stdout=StringIO(),
+        )
+        self.group.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual(self.group.post_count, 1)
+        self.assertEqual(self.other.post_count, 5)
+        self.assertEqual(self.other.group_posts.count(), 5)
+
+    def test_invalid_arguments_rejected_before_work(self):
+        """Неверные аргументы отклоняются до удаления чего-либо."""
+        with self.assertRaises(CommandError):
+            call_command(
+                'moderate', group='group', objects=['posts', 'follows'],
+                stdout=StringIO(),
+            )
+        self.assertEqual(Post.objects.count(), 6)
+
+    def test_filters_or_all_required(self):
+        """Без фильтров и --all команда ничего не удаляет."""
+        for options in ({}, {'objects': ['follows'], 'since': '2020-01-01'}):
+            with self.subTest(options=options):
+                with self.assertRaises(CommandError):
+                    call_command('moderate', stdout=StringIO(), **options)
+        self.assertEqual(Post.objects.count(), 6)
+        self.assertTrue(Follow.objects.exists())
+        call_command('moderate', all=True, stdout=StringIO())
+        self.assertFalse(Post.objects.exists())
+
+    def test_purge_comments_lowers_score(self):
+        """Удалённые комментарии снимают свой вес с рейтинга поста."""
+        before = Post.objects.get(pk=self.kept.pk).score
+        Comment.objects.create(post=self.kept, author=self.spammer, text='?')
+        call_command(
+            'moderate', author='spammer', objects=['comments'],
+            stdout=StringIO(),
+        )
+        self.assertAlmostEqual(Post.objects.get(pk=self.kept.pk).score, before)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class DedupeMediaTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_duplicates_merged(self):
+        """Дубликаты сливаются в один файл, посты ссылаются на него."""
+        author = User.objects.create_user(username='author')
+        for name in ('posts/a.gif', 'posts/b.gif'):
+            path = os.path.join(TEMP_MEDIA_ROOT, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as file:
+                file.write(b'GIF89a-duplicate')
+            Post.objects.bulk_create([
+                Post(author=author, text=name, image=name)
+            ])
+        call_command('dedupe_media', stdout=StringIO())
+        names = set(Post.objects.values_list('image', flat=True))
+        self.assertEqual(len(names), 1)
+        name = names.pop()
+        self.assertTrue(os.path.exists(os.path.join(TEMP_MEDIA_ROOT, name)))
+        self.assertFalse(
+            os.path.exists(os.path.join(TEMP_MEDIA_ROOT, 'posts/a.gif'))
+        )
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class CollectMediaGarbageTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def write(self, name):
+        path = os.path.join(TEMP_MEDIA_ROOT, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as file:
+            file.write(b'GIF89a')
+        return path
+
+    def test_only_orphans_removed(self):
+        """Удаляются только файлы без ссылок, dry-run ничего не трогает."""
+        author = User.objects.create_user(username='author')
+        kept = self.write('posts/kept.gif')
+        orphan = self.write('posts/orphan.gif')
+        Post.objects.bulk_create([
+            Post(author=author, text='Пост', image='posts/kept.gif')
+        ])
+        call_command(
+            'collect_media_garbage', dry_run=True, min_age=0,
+            stdout=StringIO()
+        )
+        self.assertTrue(os.path.exists(orphan))
+        call_command('collect_media_garbage', min_age=0, stdout=StringIO())
+        self.assertTrue(os.path.exists(kept))
+        self.assertFalse(os.path.exists(orphan))
+
+    def test_extension_and_thumbnails_compared(self):
+        """Сирота с тем же хэшем и старые миниатюры тоже удаляются."""
+        author = User.objects.create_user(username='author')
+        digest = 'ab' * 32
+        name = f'posts/ab/ab/{digest}.jpg'
+        kept = self.write(name)
+        orphan = self.write(f'posts/ab/ab/{digest}.png')
+        thumbnail = self.write('cache/12/34/1234.jpg')
+        Post.objects.bulk_create([
+            Post(author=author, text='Пост', image=name)
+        ])
+        call_command('collect_media_garbage', min_age=0, stdout=StringIO())
+        self.assertTrue(os.path.exists(kept))
+        self.assertFalse(os.path.exists(orphan))
+        self.assertFalse(os.path.exists(thumbnail))
@@ -1,13 +1,16 @@
 import shutil
 import tempfile
 from http import HTTPStatus
+from io import BytesIO
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
+from PIL import Image
 
+from posts.forms import PostForm
 from posts.models import Comment, Group, Post
 
 User = get_user_model()
@@ -15,6 +18,7 @@ User = get_user_model()
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
 
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
 class PostCreateFormTests(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -25,7 +29,7 @@ class PostCreateFormTests(TestCase):
             slug='test_slug',
             description='Тестовое описание'
         )
-        small_jpg_file = (
+        cls.small_jpg_file = (
             b'\x47\x49\x46\x38\x39\x61\x02\x00'
             b'\x01\x00\x80\x00\x00\x00\x00\x00'
             b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
@@ -35,7 +39,7 @@ class PostCreateFormTests(TestCase):
         )
         cls.image = SimpleUploadedFile(
             name='picture.jpg',
-            content=small_jpg_file,
+            content=cls.small_jpg_file,
             content_type='image/jpg',
         )
         cls.post = Post.objects.create(
@@ -57,7 +61,11 @@ class PostCreateFormTests(TestCase):
         self.form_data = {
             'text': self.post.text,
             'group': self.group.id,
-            'image': self.image
+            'image': SimpleUploadedFile(
+                name='picture.jpg',
+                content=self.small_jpg_file,
+                content_type='image/jpg',
+            )
         }
 
     def test_authorized_user_create_post(self):
@@ -151,3 +159,94 @@ class PostCreateFormTests(TestCase):
         )
         comments_count = Comment.objects.count()
         self.assertEqual(comments_count, 0)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class PostImageFormTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def jpeg(self, size, orientation=None):
+        output = BytesIO()
+        exif = Image.Exif()
+        exif[0x010F] = 'Камера'
+        if orientation:
+            exif[0x0112] = orientation
+        Image.new('RGB', size, 'red').save(output, 'JPEG', exif=exif)
+        return SimpleUploadedFile(
+            'photo.jpg', output.getvalue(), content_type='image/jpeg'
+        )
+
+    def test_large_image_downscaled_without_metadata(self):
+        """Крупная картинка уменьшается, метаданные удаляются"""
+        form = PostForm(
+            data={'text': 'Пост'},
+            files={'image': self.jpeg((settings.IMAGE_MAX_SIDE * 2, 100))},
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        image = Image.open(form.cleaned_data['image'])
+        self.assertEqual(image.size[0], settings.IMAGE_MAX_SIDE)
+        self.assertFalse(image.getexif())
+
+    def test_image_rotated_by_exif_orientation(self):
+        """Снимок с телефона поворачивается по тегу Orientation"""
+        form = PostForm(
+            data={'text': 'Пост'},
+            files={'image': self.jpeg((40, 20), orientation=6)},
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(Image.open(form.cleaned_data['image']).size, (20, 40))
+
+    def test_animated_webp_kept(self):
+        """Анимированный WebP сохраняется со всеми кадрами"""
+        output = BytesIO()
+        frames = [Image.new('RGB', (10, 10), color)
+                  for color in ('red', 'green', 'blue')]
+        frames[0].save(
+            output, 'WEBP', save_all=True, append_images=frames[1:]
+        )
+        upload = SimpleUploadedFile(
+            'anim.webp', output.getvalue(), content_type='image/webp'
+        )
+        form = PostForm(data={'text': 'Пост'}, files={'image': upload})
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(Image.open(form.cleaned_data['image']).n_frames, 3)
+
+    @override_settings(IMAGE_MAX_PIXELS=100)
+    def test_too_many_pixels_rejected(self):
+        """Картинка с большим числом пикселей отклоняется по заголовку"""
+        form = PostForm(
+            data={'text': 'Пост'}, files={'image': self.jpeg((20, 20))}
+        )
+        self.assertFalse(form.is_valid())
+        self.assertIn('image', form.errors)
+
+    @override_settings(IMAGE_MAX_SIDE=100, IMAGE_MEMORY_LIMIT=100_000)
+    def test_memory_budget_counts_decoded_raster(self):
+        """Бюджет памяти учитывает draft для JPEG и полный PNG"""
+        output = BytesIO()
+        Image.new('RGB', (800, 400), 'red').save(output, 'PNG')
+        png = SimpleUploadedFile(
+            'big.png', output.getvalue(), content_type='image/png'
+        )
+        for upload, valid in ((self.jpeg((800, 400)), True), (png, False)):
+            with self.subTest(name=upload.name):
+                form = PostForm(data={'text': 'Пост'}, files={'image': upload})
+                self.assertEqual(form.is_valid(), valid)
+
+    @override_settings(IMAGE_MAX_FULL_DECODE_PIXELS=100)
+    def test_lower_pixel_cap_without_draft(self):
+        """Для форматов без режима draft предел пикселей ниже"""
+        output = BytesIO()
+        Image.new('RGB', (20, 20), 'red').save(output, 'PNG')
+        png = SimpleUploadedFile(
+            'small.png', output.getvalue(), content_type='image/png'
+        )
+        form = PostForm(data={'text': 'Пост'}, files={'image': png})
+        self.assertIn('image', form.errors)
+        form = PostForm(
+            data={'text': 'Пост'}, files={'image': self.jpeg((20, 20))}
+        )
+        self.assertTrue(form.is_valid(), form.errors)
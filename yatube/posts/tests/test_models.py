@@ -1,11 +1,29 @@
+import shutil
+import tempfile
+
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
 
+from ..history import record_edit, text_at
+from ..media import release
 from ..models import Group, Post
 
 User = get_user_model()
 
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
 
 class PostModelTest(TestCase):
     @classmethod
@@ -61,3 +79,138 @@ class PostModelTest(TestCase):
             with self.subTest(field=field):
                 self.assertEqual(
                     post._meta.get_field(field).help_text, expected_value)
+
+
+class PostHistoryTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    def test_every_version_restored(self):
+        """Любая версия поста восстанавливается из истории правок."""
+        post = Post.objects.create(author=self.user, text='версия 0 ' * 50)
+        versions = [post.text]
+        for number in range(1, 25):
+            old_text = post.text
+            post.text = old_text.replace(
+                f'версия {number - 1}', f'версия {number}', 1
+            )
+            post.save()
+            record_edit(post, old_text)
+            versions.append(post.text)
+        for number, text in enumerate(versions):
+            with self.subTest(number=number):
+                self.assertEqual(text_at(post, number), text)
+
+    def test_delta_smaller_than_text(self):
+        """Разность хранит только правку, а не весь текст."""
+        post = Post.objects.create(author=self.user, text='а' * 1000)
+        old_text = post.text
+        post.text = old_text + 'б'
+        record_edit(post, old_text)
+        post.text += 'в'
+        revision = record_edit(post, old_text + 'б')
+        self.assertLess(len(revision.delta), 50)
+
+
+class PostTagsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.friend = User.objects.create_user(username='friend')
+
+    def test_tags_and_mentions_extracted_on_save(self):
+        """Хэштеги и упоминания раскладываются по таблицам при сохранении."""
+        post = Post.objects.create(
+            author=self.user,
+            text='#Django и #джанго, привет @friend и @nobody. a#b',
+        )
+        self.assertEqual(
+            set(post.tags.values_list('name', flat=True)),
+            {'django', 'джанго'}
+        )
+        self.assertEqual(list(post.mentions.all()), [self.friend])
+        post.text = '#django'
+        post.save()
+        self.assertEqual(post.tags.count(), 1)
+        self.assertFalse(post.mentions.exists())
+
+
+class GroupCountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(title='Первая', slug='first')
+        cls.other = Group.objects.create(title='Вторая', slug='second')
+
+    def test_counters_follow_post_changes(self):
+        """Счётчики групп меняются при создании, переносе и удалении."""
+        post = Post.objects.create(
+            author=self.user, text='Пост', group=self.group
+        )
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.post_count, 1)
+        self.assertEqual(self.group.last_post_date, post.pub_date)
+        post = Post.objects.get(pk=post.pk)
+        post.group = self.other
+        post.save()
+        self.group.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual(
+            (self.group.post_count, self.group.last_post_date), (0, None)
+        )
+        self.assertEqual(self.other.post_count, 1)
+        post.delete()
+        self.other.refresh_from_db()
+        self.assertEqual(self.other.post_count, 0)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class PostImageStorageTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def upload(self, name):
+        return SimpleUploadedFile(
+            name=name, content=SMALL_GIF, content_type='image/gif'
+        )
+
+    @override_settings(MEDIA_RELEASE_GRACE=0)
+    def test_identical_images_share_file(self):
+        """Одинаковые картинки хранятся одним файлом до последней ссылки."""
+        first = Post.objects.create(
+            author=self.user, text='Первый', image=self.upload('a.gif')
+        )
+        second = Post.objects.create(
+            author=self.user, text='Второй', image=self.upload('b.gif')
+        )
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertNotIn('a.gif', first.image.name)
+        name = first.image.name
+        first.delete()
+        release([name])
+        self.assertTrue(default_storage.exists(name))
+        second.delete()
+        release([name])
+        self.assertFalse(default_storage.exists(name))
+
+    def test_young_file_survives_release(self):
+        """Свежий файл не удаляется: его может ждать незакоммиченный пост."""
+        post = Post.objects.create(
+            author=self.user, text='Пост', image=self.upload('c.gif')
+        )
+        name = post.image.name
+        post.delete()
+        with override_settings(MEDIA_RELEASE_GRACE=600):
+            release([name])
+        self.assertTrue(default_storage.exists(name))
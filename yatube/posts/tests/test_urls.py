@@ -1,9 +1,10 @@
 from http import HTTPStatus
 
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
-from django.urls import reverse
+from django.test import Client, SimpleTestCase, TestCase
+from django.urls import NoReverseMatch, include, path, reverse, set_urlconf
 
+from ..links import posts_url, routes
 from ..models import Group, Post
 
 User = get_user_model()
@@ -178,3 +179,45 @@ class PostURLTests(TestCase):
         response = self.guest_client.get('/unexisting-page/')
         self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
         self.assertTemplateUsed(response, template)
+
+
+class PrefixedUrls:
+    urlpatterns = [path('prefix/', include('posts.urls'))]
+
+
+class PostsUrlBuilderTests(SimpleTestCase):
+    def test_matches_reverse(self):
+        """posts_url строит те же адреса, что и reverse."""
+        args = {
+            'group_list': ['test-slug'],
+            'tag_list': ['тег'],
+            'profile': ['user name'],
+            'profile_follow': ['user'],
+            'profile_unfollow': ['user'],
+            'post_detail': [7],
+            'post_edit': [7],
+            'add_comment': [7],
+            'comment_stream': [7],
+        }
+        for name in routes():
+            with self.subTest(name=name):
+                self.assertEqual(
+                    posts_url(name, *args.get(name, [])),
+                    reverse(f'posts:{name}', args=args.get(name, [])),
+                )
+
+    def test_request_urlconf(self):
+        """Учитывается URLconf запроса, а не только ROOT_URLCONF."""
+        set_urlconf(PrefixedUrls)
+        self.addCleanup(set_urlconf, None)
+        self.assertEqual(posts_url('post_detail', 7), '/prefix/posts/7/')
+        self.assertEqual(
+            posts_url('post_detail', 7), reverse('posts:post_detail', args=[7])
+        )
+
+    def test_invalid_arguments(self):
+        for name, args in (('post_detail', ['x']), ('index', [1]),
+                           ('missing', [])):
+            with self.subTest(name=name):
+                with self.assertRaises(NoReverseMatch):
+                    posts_url(name, *args)
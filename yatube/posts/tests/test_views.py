@@ -1,22 +1,42 @@
 import shutil
 import tempfile
+from array import array
+from datetime import timedelta
 from http import HTTPStatus
+from itertools import product
+from unittest import mock
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.template.loader import render_to_string
 from django.urls import reverse
+from django.utils import timezone
 
+from ..cards import render_card
+from ..following import FOLLOWED_KEY, followed_ids, is_following
 from ..forms import PostForm
-from ..models import Group, Post, Follow
+from ..live import LocalBroker, get_broker
+from ..models import Comment, Group, Post, Follow, Suggestion
+from ..ranking import decay
+from ..unread import forget_followers_unread
+from ..utils import CachedCountPaginator, estimated_count
 
 User = get_user_model()
 
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+TEMP_CACHE_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+FILE_CACHE = {'default': {
+    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    'LOCATION': TEMP_CACHE_DIR,
+}}
 
 
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
 class PostPageTests(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -154,6 +174,14 @@ class PostPageTests(TestCase):
         self.assertIn('form', response.context)
         self.assertIsInstance(response.context.get('form'), PostForm)
 
+    def test_tag_list_show_tagged_posts(self):
+        """Лента хэштега показывает только посты с этим тегом"""
+        tagged = Post.objects.create(author=self.author, text='Пост #Тест')
+        response = self.guest_client.get(
+            reverse('posts:tag_list', kwargs={'name': 'тест'})
+        )
+        self.assertEqual(list(response.context['page_obj']), [tagged])
+
     def test_post_another_group(self):
         """Пост не попал в другую группу"""
         response = self.guest_client.get(
@@ -187,6 +215,7 @@ class PaginatorViewsTest(TestCase):
         Post.objects.bulk_create(cls.posts)
 
     def setUp(self):
+        cache.clear()
         self.guest_client = Client()
         self.author = User.objects.get(username='test_username')
         self.authorized_client = Client()
@@ -219,6 +248,50 @@ class PaginatorViewsTest(TestCase):
                 len(response.context.get('page_obj').object_list), 3
             )
 
+    def test_count_cached_until_posts_change(self):
+        """Число постов группы кэшируется до новой записи."""
+        url = reverse('posts:group_list', kwargs={'slug': self.group.slug})
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertFalse(
+            [query for query in queries if 'COUNT(' in query['sql']]
+        )
+        self.assertEqual(response.context['page_obj'].paginator.count, 13)
+        Post.objects.create(
+            text='Новый пост', author=self.author, group=self.group
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.context['page_obj'].paginator.count, 14)
+
+    def test_joined_count_expires_on_follow(self):
+        """Счётчик ленты с соединением Follow сбрасывается подпиской."""
+        reader = User.objects.create_user(username='reader')
+        posts = Post.objects.filter(author__following__user=reader)
+        self.assertEqual(CachedCountPaginator(posts, 10).count, 0)
+        Follow.objects.create(user=reader, author=self.author)
+        self.assertEqual(CachedCountPaginator(posts, 10).count, 13)
+
+    def test_estimated_count_from_statistics(self):
+        """После ANALYZE число постов берётся из статистики SQLite."""
+        if connection.vendor != 'sqlite':
+            self.skipTest('проверяется статистика SQLite')
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.assertEqual(estimated_count(Post), 13)
+
+    @override_settings(PAGINATOR_WINDOW=1)
+    def test_page_links_window(self):
+        """Ссылки только на соседние страницы."""
+        Post.objects.bulk_create(
+            Post(text=f'Ещё {number}', author=self.author)
+            for number in range(3 * settings.PAGINATION)
+        )
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(list(response.context['page_obj'].window), [1, 2])
+        self.assertNotContains(response, '?page=3"')
+        self.assertContains(response, '?page=5"')
+
 
 class CacheTests(TestCase):
     @classmethod
@@ -266,6 +339,7 @@ class FollowTests(TestCase):
         )
 
     def setUp(self):
+        cache.clear()
         self.post = Post.objects.create(
             author=self.user_following,
             text='Тестовая запись 777'
@@ -304,6 +378,43 @@ class FollowTests(TestCase):
         ).exists())
         self.assertEqual(Follow.objects.count(), 0)
 
+    @override_settings(CACHES=FILE_CACHE)
+    def test_followed_ids_cached(self):
+        """Подписки читаются из общего кэша и сбрасываются при отписке"""
+        self.addCleanup(shutil.rmtree, TEMP_CACHE_DIR, True)
+        cache.clear()
+        self.assertEqual(
+            followed_ids(self.user_follower), {self.user_following.pk}
+        )
+        with self.assertNumQueries(0):
+            self.assertTrue(
+                is_following(self.user_follower, self.user_following)
+            )
+        self.follower.delete()
+        self.assertEqual(followed_ids(self.user_follower), set())
+
+    def test_followed_ids_not_cached_per_process(self):
+        """На LocMemCache подписки всегда читаются из базы"""
+        followed_ids(self.user_follower)
+        self.follower.delete()
+        with self.assertNumQueries(1):
+            self.assertEqual(followed_ids(self.user_follower), set())
+
+    @override_settings(CACHES=FILE_CACHE)
+    def test_unfollow_ignores_stale_cache(self):
+        """Отписка удаляет подписку, даже если кэш устарел"""
+        self.addCleanup(shutil.rmtree, TEMP_CACHE_DIR, True)
+        cache.set(
+            FOLLOWED_KEY.format(self.user_follower.pk), array('L')
+        )
+        self.client_follower.get(
+            reverse(
+                'posts:profile_unfollow',
+                kwargs={'username': self.user_following.username}
+            )
+        )
+        self.assertFalse(Follow.objects.exists())
+
     def test_appears_in_subscription_feed(self):
         """Пост появляется в ленте подписчиков"""
         response = self.client_follower.get('/follow/')
@@ -320,3 +431,283 @@ class FollowTests(TestCase):
         """Попытка гостя подписаться"""
         response = self.guest_client.get('/follow/')
         self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    def test_unread_counter(self):
+        """Счётчик непрочитанных обнуляется после визита в ленту"""
+        cache.clear()
+        url = reverse('posts:follow_unread')
+        response = self.client_follower.get(url)
+        self.assertEqual(response.json(), {'count': 1})
+        self.client_follower.get(reverse('posts:follow_index'))
+        response = self.client_follower.get(url)
+        self.assertEqual(response.json(), {'count': 0})
+
+    def test_feed_visit_written_only_for_newer_posts(self):
+        """Повторный визит без новых постов ничего не пишет в базу"""
+        cache.clear()
+        feed = reverse('posts:follow_index')
+        self.client_follower.get(feed)
+        with CaptureQueriesContext(connection) as queries:
+            self.client_follower.get(feed)
+        self.assertFalse([
+            query for query in queries
+            if 'posts_feedvisit' in query['sql']
+            and not query['sql'].startswith('SELECT')
+        ])
+
+    def test_unread_counter_reset_by_author_version(self):
+        """Новый пост автора сбрасывает счётчик одной записью в кэш"""
+        cache.clear()
+        url = reverse('posts:follow_unread')
+        self.assertEqual(self.client_follower.get(url).json(), {'count': 1})
+        Post.objects.create(author=self.user_following, text='Новый')
+        with self.assertNumQueries(0):
+            forget_followers_unread(self.user_following.pk)
+        self.assertEqual(self.client_follower.get(url).json(), {'count': 2})
+
+    def test_unread_counter_reset_on_follow_change(self):
+        """Подписка и отписка сразу меняют счётчик"""
+        cache.clear()
+        url = reverse('posts:follow_unread')
+        self.assertEqual(self.client_follower.get(url).json(), {'count': 1})
+        self.client_follower.get(reverse(
+            'posts:profile_unfollow', args=[self.user_following.username]
+        ))
+        self.assertEqual(self.client_follower.get(url).json(), {'count': 0})
+
+
+class CommentStreamTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_username')
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+        cls.comment = Comment.objects.create(
+            post=cls.post, author=cls.author, text='Пропущенный комментарий'
+        )
+
+    def test_stream_resends_missed_comments(self):
+        """После переподключения приходят пропущенные комментарии"""
+        response = self.client.get(
+            reverse('posts:comment_stream', kwargs={'post_id': self.post.pk}),
+            HTTP_LAST_EVENT_ID='0',
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = iter(response.streaming_content)
+        next(stream)
+        self.assertIn(self.comment.text, next(stream).decode())
+        response.close()
+        self.assertEqual(get_broker().size, 0)
+
+    @override_settings(LIVE_MAX_SUBSCRIBERS=1, LIVE_MAX_DURATION=0)
+    def test_streams_capped_and_short(self):
+        """Лишний поток получает 503, открытый закрывается по сроку"""
+        url = reverse(
+            'posts:comment_stream', kwargs={'post_id': self.post.pk}
+        )
+        response = self.client.get(url)
+        self.assertEqual(
+            self.client.get(url).status_code,
+            HTTPStatus.SERVICE_UNAVAILABLE,
+        )
+        chunks = list(response.streaming_content)
+        self.assertEqual(
+            chunks, [f'retry: {settings.LIVE_RETRY * 1000}\n\n'.encode()]
+        )
+        self.assertEqual(get_broker().size, 0)
+
+    def test_broker_delivers_to_channel_subscribers(self):
+        """Брокер отдаёт событие только подписчикам своего канала"""
+        broker = LocalBroker()
+        subscription = broker.subscribe(self.post.pk)
+        other = broker.subscribe(self.post.pk + 1)
+        broker.publish(self.post.pk, {'id': 1})
+        self.assertEqual(subscription.get(0), [{'id': 1}])
+        self.assertEqual(other.get(0), [])
+        self.assertIsNot(subscription.condition, other.condition)
+
+    @override_settings(LIVE_QUEUE_SIZE=1)
+    def test_stream_resends_newest_missed_comments(self):
+        """Из пропущенных сверх очереди приходят самые свежие"""
+        newest = Comment.objects.create(
+            post=self.post, author=self.author, text='Свежий комментарий'
+        )
+        response = self.client.get(
+            reverse('posts:comment_stream', kwargs={'post_id': self.post.pk}),
+            HTTP_LAST_EVENT_ID='0',
+        )
+        stream = iter(response.streaming_content)
+        next(stream)
+        self.assertIn(newest.text, next(stream).decode())
+        response.close()
+
+
+class HotFeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.quiet = Post.objects.create(author=cls.author, text='Тихий')
+        cls.loud = Post.objects.create(author=cls.author, text='Обсуждаемый')
+        for i in range(3):
+            Comment.objects.create(
+                post=cls.loud, author=cls.reader, text=f'Комментарий {i}'
+            )
+
+    def test_hot_feed_ranked_by_score(self):
+        """Обсуждаемый пост выше в ленте популярного"""
+        response = self.client.get(reverse('posts:hot_index'))
+        self.assertEqual(
+            list(response.context['page_obj']), [self.loud, self.quiet]
+        )
+
+    def test_follow_and_decay_update_score(self):
+        """Подписка прибавляет рейтинг, затухание его уменьшает"""
+        before = Post.objects.get(pk=self.quiet.pk).score
+        Follow.objects.create(user=self.reader, author=self.author)
+        followed = Post.objects.get(pk=self.quiet.pk).score
+        self.assertGreater(followed, before)
+        decay(settings.HOT_HALF_LIFE_HOURS)
+        self.assertAlmostEqual(
+            Post.objects.get(pk=self.quiet.pk).score, followed / 2
+        )
+
+    def test_unfollow_after_decay_keeps_post_in_feed(self):
+        """Отписка после затухания не выбивает пост из ленты"""
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        decay(settings.HOT_HALF_LIFE_HOURS * 24)
+        follow.delete()
+        self.assertGreater(Post.objects.get(pk=self.quiet.pk).score, 0)
+
+    def test_deleted_comment_lowers_score(self):
+        """Удалённый комментарий снимает свой вес с рейтинга"""
+        before = Post.objects.get(pk=self.loud.pk).score
+        self.loud.comments.first().delete()
+        self.assertAlmostEqual(
+            Post.objects.get(pk=self.loud.pk).score,
+            before - settings.HOT_COMMENT_WEIGHT
+        )
+
+    def test_comment_does_not_revive_old_post(self):
+        """Комментарий к посту старше окна не возвращает его в ленту"""
+        Post.objects.filter(pk=self.quiet.pk).update(
+            pub_date=timezone.now()
+            - timedelta(days=settings.HOT_WINDOW_DAYS + 1)
+        )
+        decay(settings.HOT_DECAY_INTERVAL_HOURS)
+        Comment.objects.create(
+            post=self.quiet, author=self.reader, text='Поздно'
+        )
+        self.assertEqual(Post.objects.get(pk=self.quiet.pk).score, 0)
+
+
+class ProfileQueryTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='author')
+        cls.reader = User.objects.create(username='reader')
+        group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.author, group=group, text=f'Пост {i}')
+            for i in range(settings.PAGINATION + 2)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.reader)
+
+    def test_profile_query_budget(self):
+        """Профиль: пользователь, автор, страница и рекомендации."""
+        url = reverse('posts:profile', args=[self.author.username])
+        self.client.get(url)
+        # Пользователь запроса читается из базы: на LocMemCache
+        # CachedModelBackend его не кэширует.
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(response.context['post_count'], 12)
+        self.assertEqual(response.context['page_obj'].paginator.count, 12)
+        self.assertFalse(response.context['following'])
+
+
+class ProfileSuggestionsTests(TestCase):
+    @override_settings(SUGGESTIONS_SHOWN=1)
+    def test_followed_and_viewed_authors_skipped_before_slicing(self):
+        """Рекомендации без подписок и открытого профиля, затем срез"""
+        reader, followed, viewed, other = [
+            User.objects.create_user(username=name)
+            for name in ('reader', 'followed', 'viewed', 'other')
+        ]
+        Follow.objects.create(user=reader, author=followed)
+        Suggestion.objects.bulk_create([
+            Suggestion(user=reader, author=followed, score=3),
+            Suggestion(user=reader, author=viewed, score=2),
+            Suggestion(user=reader, author=other, score=1),
+        ])
+        self.client.force_login(reader)
+        response = self.client.get(
+            reverse('posts:profile', args=[viewed.username])
+        )
+        self.assertEqual(response.context['suggestions'], [other])
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class PostCardTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.named = User.objects.create(
+            username='card', first_name='Лев <b>', last_name='"Толстой"'
+        )
+        cls.unnamed = User.objects.create(username='noname')
+        cls.group = Group.objects.create(title='Группа', slug='card-group')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def image(self):
+        return SimpleUploadedFile(
+            'card.gif',
+            b'\x47\x49\x46\x38\x39\x61\x02\x00'
+            b'\x01\x00\x80\x00\x00\x00\x00\x00'
+            b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+            b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+            b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+            b'\x0A\x00\x3B',
+            content_type='image/gif',
+        )
+
+    def test_card_matches_template(self):
+        """Быстрая карточка совпадает с шаблоном во всех ветках."""
+        thumbnail = mock.Mock(url='/media/cache/a&b.gif')
+        branches = product(
+            (None, self.group),
+            (False, True),
+            ('Простой текст', 'Текст & <script>\n"кавычки"'),
+            (self.named, self.unnamed),
+        )
+        for group, with_image, text, author in branches:
+            post = Post.objects.create(
+                author=author, group=group, text=text,
+                image=self.image() if with_image else None,
+            )
+            with self.subTest(group=group, image=with_image, text=text,
+                              author=author.username), \
+                    mock.patch('posts.cards.get_thumbnail',
+                               return_value=thumbnail), \
+                    mock.patch('sorl.thumbnail.templatetags.thumbnail.'
+                               'get_thumbnail', return_value=thumbnail):
+                card = render_card(post)
+                self.assertEqual(
+                    card,
+                    render_to_string(
+                        'posts/includes/post_list.html', {'post': post}
+                    ),
+                )
+                if with_image:
+                    self.assertIn('src="/media/cache/a&amp;b.gif"', card)
@@ -0,0 +1,103 @@
+import time
+from array import array
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .following import followed_ids, followed_posts
+from .models import FeedVisit
+
+UNREAD_KEY = 'posts:unread:{}'
+VISIT_KEY = 'posts:feed-visit:{}'
+AUTHOR_VERSION_KEY = 'posts:unread-author:{}'
+
+
+def last_visit(user):
+    """Дата самого свежего поста, который пользователь видел в ленте."""
+    key = VISIT_KEY.format(user.pk)
+    visited = cache.get(key)
+    if visited is None:
+        visit = FeedVisit.objects.filter(user=user).first()
+        visited = visit.visited if visit else user.date_joined
+        cache.set(key, visited, settings.UNREAD_CACHE_TIMEOUT)
+    return visited
+
+
+def authors_version(author_ids):
+    """Отметка времени последнего изменения постов авторов.
+
+    Потерянная отметка автора заводится заново текущим временем, так
+    что вытеснение из кэша только заставляет пересчитать счётчик.
+    """
+    keys = [AUTHOR_VERSION_KEY.format(pk) for pk in author_ids]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        now = time.time_ns()
+        cache.set_many(
+            dict.fromkeys(missing, now), settings.UNREAD_CACHE_TIMEOUT
+        )
+        versions.update(dict.fromkeys(missing, now))
+    return max(versions.values(), default=0)
+
+
+def count_unread(user):
+    """Число постов избранных авторов после последнего визита в ленту.
+
+    Считается по индексу (author, pub_date) и кэшируется на
+    UNREAD_CACHE_TIMEOUT секунд вместе с id избранных авторов и
+    отметкой их версии: новый пост меняет одну отметку автора, и
+    счётчики его подписчиков пересчитываются при следующем чтении.
+    Подписки и отписки сбрасывают счётчик напрямую.
+    """
+    key = UNREAD_KEY.format(user.pk)
+    cached = cache.get(key)
+    if cached is not None:
+        author_ids, version, count = cached
+        if authors_version(author_ids) == version:
+            return count
+    author_ids = array('L', sorted(followed_ids(user)))
+    version = authors_version(author_ids)
+    count = followed_posts(user).filter(
+        pub_date__gt=last_visit(user)
+    ).count()
+    cache.set(
+        key, (author_ids, version, count), settings.UNREAD_CACHE_TIMEOUT
+    )
+    return count
+
+
+def mark_feed_seen(user, posts):
+    """Запоминает самый свежий из показанных постов.
+
+    В базу пишет, только если он новее уже сохранённого, поэтому
+    листание ленты и повторные визиты ничего не записывают.
+    """
+    newest = max((post.pub_date for post in posts), default=None)
+    if newest is None or newest <= last_visit(user):
+        return
+    FeedVisit.objects.update_or_create(
+        user=user, defaults={'visited': newest}
+    )
+    cache.set(
+        VISIT_KEY.format(user.pk), newest, settings.UNREAD_CACHE_TIMEOUT
+    )
+    cache.delete(UNREAD_KEY.format(user.pk))
+
+
+def forget_unread(*user_ids):
+    cache.delete_many([UNREAD_KEY.format(pk) for pk in user_ids])
+
+
+def forget_followers_unread(*author_ids):
+    """Сбрасывает счётчики всех подписчиков авторов.
+
+    Пишет по одной отметке на автора, не перебирая подписчиков.
+    """
+    cache.set_many(
+        dict.fromkeys(
+            [AUTHOR_VERSION_KEY.format(pk) for pk in author_ids],
+            time.time_ns(),
+        ),
+        settings.UNREAD_CACHE_TIMEOUT,
+    )
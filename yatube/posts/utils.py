@@ -1,9 +1,141 @@
+import hashlib
+import time
+
 from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
 from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
+
+COUNT_KEY = 'posts:count:{}:{}'
+COUNT_VERSION_KEY = 'posts:count-version:{}'
+
+ESTIMATE_QUERIES = {
+    'postgresql': (
+        'SELECT reltuples::bigint FROM pg_class WHERE relname = %s'
+    ),
+    'mysql': (
+        'SELECT table_rows FROM information_schema.tables '
+        'WHERE table_schema = DATABASE() AND table_name = %s'
+    ),
+    # Строка с idx IS NULL есть только у таблиц без индексов; у
+    # остальных первое число stat любого индекса — число строк таблицы.
+    'sqlite': (
+        'SELECT stat FROM sqlite_stat1 WHERE tbl = %s '
+        'ORDER BY idx IS NOT NULL LIMIT 1'
+    ),
+}
+
+
+def estimated_count(model, using='default'):
+    """Примерное число строк таблицы по статистике базы данных.
+
+    Возвращает None, если статистики нет.
+    """
+    connection = connections[using]
+    sql = ESTIMATE_QUERIES.get(connection.vendor)
+    if sql is None:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [model._meta.db_table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None or row[0] is None:
+        return None
+    return int(str(row[0]).split()[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор, который для больших таблиц без фильтров берёт
+    число строк из статистики базы вместо COUNT(*)."""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_count(queryset.model, queryset.db)
+            if (estimate is not None
+                    and estimate >= settings.ESTIMATE_COUNT_FROM):
+                return estimate
+        return super().count
+
+
+def count_version(table):
+    """Текущая версия счётчиков выборок, читающих таблицу table."""
+    key = COUNT_VERSION_KEY.format(table)
+    version = cache.get(key)
+    if version is None:
+        # После вытеснения из кэша версия не должна совпасть
+        # ни с одной из прежних.
+        version = time.time_ns()
+        cache.add(key, version, None)
+        version = cache.get(key, version)
+    return version
+
+
+def bump_count_version(model):
+    """Делает устаревшими все закэшированные счётчики таблицы model."""
+    key = COUNT_VERSION_KEY.format(model._meta.db_table)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+class CachedCountPaginator(EstimatedCountPaginator):
+    """Пагинатор, который кэширует COUNT(*) по тексту запроса.
+
+    Ключ содержит версии всех таблиц запроса, в том числе
+    присоединённых (Follow в ленте подписок, связи тегов).
+    Сигналы, массовые операции и затухание рейтингов увеличивают
+    версию при записи, и счётчик считается заново.
+
+    Допустимая неточность: версии и счётчики живут в кэше, и на
+    LocMemCache запись в одном процессе не сбрасывает счётчики
+    других, так что там число страниц отстаёт не дольше
+    PAGINATOR_COUNT_TIMEOUT секунд.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        try:
+            sql, params = queryset.query.sql_with_params()
+        except EmptyResultSet:
+            return 0
+        signature = hashlib.md5(
+            repr((queryset.db, sql, params)).encode()
+        ).hexdigest()
+        tables = sorted({
+            join.table_name for join in queryset.query.alias_map.values()
+        })
+        versions = '.'.join(str(count_version(table)) for table in tables)
+        key = COUNT_KEY.format(versions, signature)
+        count = cache.get(key)
+        if count is None:
+            count = super().count
+            cache.set(key, count, settings.PAGINATOR_COUNT_TIMEOUT)
+        return count
+
+    def page_window(self, number):
+        """Номера страниц вокруг number, не больше PAGINATOR_WINDOW
+        с каждой стороны."""
+        side = settings.PAGINATOR_WINDOW
+        return range(
+            max(1, number - side), min(self.num_pages, number + side) + 1
+        )
 
 
-def paginate(request, posts):
-    paginator = Paginator(posts, settings.PAGINATION)
+def paginate(request, posts, count=None):
+    """Страница постов; известное заранее число постов передаётся
+    в count, чтобы пагинатор не делал COUNT(*)."""
+    paginator = CachedCountPaginator(posts, settings.PAGINATION)
+    if count is not None:
+        paginator.count = count
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    page_obj.window = paginator.page_window(page_obj.number)
     return page_obj
@@ -1,9 +1,23 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
+from django.db.models import F
+from django.http import (
+    HttpResponse, JsonResponse, StreamingHttpResponse
+)
 from django.shortcuts import get_object_or_404, redirect, render
 
+from .archive import get_post_or_archived
+from .following import followed_posts
 from .forms import CommentForm, PostForm
-from .models import Comment, Follow, Group, Post
+from .history import record_edit
+from .live import BrokerFull, comment_event, event_stream, get_broker
+from .models import Follow, Group, Post, Tag
+from .profiles import load_profile
+from .ranking import hot_posts
+from .suggestions import suggestions_for
+from .unread import count_unread, mark_feed_seen
 from .utils import paginate
 
 User = get_user_model()
@@ -18,6 +32,25 @@ def index(request):
     return render(request, 'posts/index.html', context)
 
 
+def hot_index(request):
+    page_obj = paginate(request, hot_posts())
+    context = {
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/hot.html', context)
+
+
+def group_index(request):
+    groups = Group.objects.order_by(
+        F('last_post_date').desc(nulls_last=True), 'title'
+    )
+    page_obj = paginate(request, groups)
+    context = {
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/group_index.html', context)
+
+
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
     posts = group.group_posts.all()
@@ -29,26 +62,33 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
-def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.all()
-    post_count = posts.count()
+def tag_posts(request, name):
+    tag = get_object_or_404(Tag, name=name.lower())
+    posts = tag.posts.all()
     page_obj = paginate(request, posts)
-    following = request.user.is_authenticated and author.following.filter(
-        user=request.user).exists()
+    context = {
+        'page_obj': page_obj,
+        'tag': tag,
+    }
+    return render(request, 'posts/tag_list.html', context)
+
+
+def profile(request, username):
+    author, posts = load_profile(username, request.user)
+    page_obj = paginate(request, posts, count=author.post_count)
     context = {
         'page_obj': page_obj,
         'author': author,
-        'post_count': post_count,
-        'following': following,
+        'post_count': author.post_count,
+        'following': author.followed_by_viewer,
+        'suggestions': suggestions_for(request.user, exclude=author),
     }
     return render(request, 'posts/profile.html', context)
 
 
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post, comments = get_post_or_archived(post_id)
     form = CommentForm(request.POST or None)
-    comments = Comment.objects.select_related('post').filter(post=post_id)
     context = {
         'post': post,
         'form': form,
@@ -57,9 +97,39 @@ def post_detail(request, post_id):
     return render(request, 'posts/post_detail.html', context)
 
 
+def comment_stream(request, post_id):
+    post = get_object_or_404(Post, pk=post_id)
+    broker = get_broker()
+    try:
+        subscription = broker.subscribe(post.pk)
+    except BrokerFull:
+        response = HttpResponse(status=503)
+        response['Retry-After'] = settings.LIVE_HEARTBEAT
+        return response
+    missed = []
+    last_event_id = request.META.get('HTTP_LAST_EVENT_ID', '')
+    if last_event_id.isdigit():
+        # Самые свежие LIVE_QUEUE_SIZE пропущенных, по порядку.
+        missed = [
+            comment_event(comment)
+            for comment in reversed(
+                post.comments.select_related('author').filter(
+                    pk__gt=last_event_id
+                ).order_by('-pk')[:settings.LIVE_QUEUE_SIZE]
+            )
+        ]
+    response = StreamingHttpResponse(
+        event_stream(broker, subscription, missed),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @login_required
 def post_create(request):
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
@@ -74,6 +144,7 @@ def post_create(request):
 @login_required
 def post_edit(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
+    old_text = post.text
     form = PostForm(
         request.POST or None,
         files=request.FILES or None,
@@ -84,7 +155,9 @@ def post_edit(request, post_id):
         return redirect('posts:post_detail', post_id)
 
     if form.is_valid():
-        form.save()
+        with transaction.atomic():
+            form.save()
+            record_edit(post, old_text)
         return redirect('posts:post_detail', post_id)
 
     context = {
@@ -108,15 +181,19 @@ def add_comment(request, post_id):
 
 @login_required
 def follow_index(request):
-    posts = (
-        Post.objects.filter(author__following__user=request.user))
-    page_obj = paginate(request, posts)
+    page_obj = paginate(request, followed_posts(request.user))
+    mark_feed_seen(request.user, page_obj)
     context = {
         'page_obj': page_obj,
     }
     return render(request, 'posts/follow.html', context)
 
 
+@login_required
+def follow_unread(request):
+    return JsonResponse({'count': count_unread(request.user)})
+
+
 @login_required
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
@@ -133,7 +210,5 @@ def profile_follow(request, username):
 @login_required
 def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
-    is_follower = Follow.objects.filter(user=request.user, author=author)
-    if is_follower.exists():
-        is_follower.delete()
+    Follow.objects.filter(user=request.user, author=author).delete()
     return redirect('posts:profile', username=author)
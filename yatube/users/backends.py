@@ -0,0 +1,86 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db import router
+
+from core.cache import is_shared
+
+from . import hashers
+
+USER_KEY = 'users:user:{}'
+SESSION_HASH = '_session_auth_hash'
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который берёт пользователя запроса из кэша.
+
+    В кэше лежат поля пользователя без пароля и готовый хэш
+    сессии, с которым Django сверяет сессию. Запись сбрасывается
+    при любом сохранении пользователя, в том числе при смене
+    пароля, поэтому кэш нужен общий для всех воркеров: на
+    LocMemCache пользователь всегда читается из базы.
+    Пароли проверяются в ограниченном пуле users.hashers.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Хэшируем впустую, чтобы время ответа не выдавало,
+            # существует ли пользователь.
+            hashers.make_password(password)
+            return None
+        if not user.has_usable_password():
+            return None
+        if not hashers.check_password(password, user.password):
+            return None
+        if not self.user_can_authenticate(user):
+            return None
+        if hashers.needs_rehash(user.password):
+            user.password = hashers.make_password(password)
+            user.save(update_fields=['password'])
+        return user
+
+    def get_user(self, user_id):
+        if not is_shared():
+            return super().get_user(user_id)
+        key = USER_KEY.format(user_id)
+        fields = cache.get(key)
+        if fields is not None:
+            return from_cache(fields)
+        user = super().get_user(user_id)
+        if user is not None:
+            cache.set(key, to_cache(user), settings.AUTH_USER_CACHE_TIMEOUT)
+        return user
+
+
+def to_cache(user):
+    fields = {
+        field.attname: getattr(user, field.attname)
+        for field in user._meta.concrete_fields
+        if field.attname != 'password'
+    }
+    fields[SESSION_HASH] = user.get_session_auth_hash()
+    return fields
+
+
+def from_cache(fields):
+    """Пользователь из кэша; пароль отложен и читается по обращению."""
+    UserModel = get_user_model()
+    fields = dict(fields)
+    session_hash = fields.pop(SESSION_HASH)
+    user = UserModel.from_db(
+        router.db_for_read(UserModel), list(fields), list(fields.values())
+    )
+    user.get_session_auth_hash = lambda: session_hash
+    return user
+
+
+def forget_user(user_id):
+    cache.delete(USER_KEY.format(user_id))
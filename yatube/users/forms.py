@@ -1,10 +1,31 @@
 from django.contrib.auth import get_user_model
-from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.forms import AuthenticationForm, UserCreationForm
+from django.core.exceptions import ValidationError
+
+from . import hashers
 
 User = get_user_model()
 
+BUSY_MESSAGE = 'Сервер перегружен входами, попробуйте через минуту.'
+
 
 class CreationForm(UserCreationForm):
     class Meta(UserCreationForm.Meta):
         model = User
         fields = ('first_name', 'last_name', 'username', 'email')
+
+    def save(self, commit=True):
+        """Сохраняет пользователя, вычисляя хэш пароля в пуле."""
+        user = super(UserCreationForm, self).save(commit=False)
+        user.password = hashers.make_password(self.cleaned_data['password1'])
+        if commit:
+            user.save()
+        return user
+
+
+class LoginForm(AuthenticationForm):
+    def clean(self):
+        try:
+            return super().clean()
+        except hashers.HashingBusy:
+            raise ValidationError(BUSY_MESSAGE, code='busy')
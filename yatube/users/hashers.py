@@ -0,0 +1,144 @@
+"""Хэширование паролей с настраиваемой стоимостью.
+
+Проверка и вычисление хэшей выполняются в общем пуле потоков
+ограниченного размера: при наплыве входов CPU занимают не больше
+PASSWORD_HASH_WORKERS хэшей, остальные запросы ждут место в очереди
+не дольше PASSWORD_HASH_WAIT секунд и получают отказ HashingBusy.
+hashlib, argon2-cffi и bcrypt отпускают GIL, поэтому потоки пула
+действительно работают параллельно.
+
+Время каждого хэширования и отказы пишутся в лог users.hashers
+обслуживающего процесса. Сводные счётчики для password_hash_stats
+копятся в кэше и имеют смысл только на общем для процессов кэше.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+METRIC_KEYS = {
+    'count': 'hashing:count',
+    'ms': 'hashing:ms',
+    'rejected': 'hashing:rejected',
+}
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """PBKDF2 с числом итераций из PASSWORD_PBKDF2_ITERATIONS."""
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Argon2 с параметрами из PASSWORD_ARGON2_*."""
+
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2_PARALLELISM
+
+
+class BCryptSHA256PasswordHasher(hashers.BCryptSHA256PasswordHasher):
+    """bcrypt с числом раундов из PASSWORD_BCRYPT_ROUNDS."""
+
+    @property
+    def rounds(self):
+        return settings.PASSWORD_BCRYPT_ROUNDS
+
+
+class HashingBusy(Exception):
+    """Очередь на хэширование заполнена."""
+
+
+class HashingPool:
+    def __init__(self, workers, queue_size):
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='hashing'
+        )
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def run(self, func, *args):
+        if not self.slots.acquire(timeout=settings.PASSWORD_HASH_WAIT):
+            record_rejected()
+            raise HashingBusy
+        try:
+            return self.executor.submit(timed, func, *args).result()
+        finally:
+            self.slots.release()
+
+
+@lru_cache(maxsize=None)
+def get_pool():
+    return HashingPool(
+        settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE
+    )
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        record_time(time.perf_counter() - start)
+
+
+def check_password(password, encoded):
+    """Проверяет пароль в пуле, не пересчитывая хэш."""
+    return get_pool().run(hashers.check_password, password, encoded)
+
+
+def make_password(password):
+    return get_pool().run(hashers.make_password, password)
+
+
+def needs_rehash(encoded):
+    """Хэш получен не основным хэшером или с устаревшей стоимостью."""
+    preferred = hashers.get_hasher('default')
+    try:
+        hasher = hashers.identify_hasher(encoded)
+    except ValueError:
+        return False
+    return (hasher.algorithm != preferred.algorithm
+            or preferred.must_update(encoded))
+
+
+def record_time(seconds):
+    logger.info('Password hashed in %.1f ms', seconds * 1000)
+    add_metric('count', 1)
+    add_metric('ms', round(seconds * 1000))
+
+
+def record_rejected():
+    logger.warning('Password hashing queue is full, request rejected')
+    add_metric('rejected', 1)
+
+
+def add_metric(name, value):
+    key = METRIC_KEYS[name]
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key, value)
+    except ValueError:
+        cache.set(key, value, None)
+
+
+def metrics():
+    """Число хэширований, суммарное время в мс и число отказов."""
+    values = cache.get_many(METRIC_KEYS.values())
+    return {name: values.get(key, 0) for name, key in METRIC_KEYS.items()}
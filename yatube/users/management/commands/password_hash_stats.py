@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.cache import is_shared
+from users.hashers import metrics
+
+
+class Command(BaseCommand):
+    help = 'Показывает статистику хэширования паролей.'
+
+    def handle(self, *args, **options):
+        if not is_shared():
+            raise CommandError(
+                'Счётчики хранятся в кэше, а LocMemCache у каждого '
+                'процесса свой: команда увидит только свои нули. '
+                'Настройте общий кэш или смотрите лог users.hashers.'
+            )
+        stats = metrics()
+        average = stats['ms'] / stats['count'] if stats['count'] else 0
+        self.stdout.write(
+            f'Хэшер: {settings.PASSWORD_HASHER}, '
+            f'потоков: {settings.PASSWORD_HASH_WORKERS}\n'
+            f'Хэширований: {stats["count"]}, '
+            f'в среднем {average:.1f} мс\n'
+            f'Отказов из-за очереди: {stats["rejected"]}'
+        )
@@ -1,11 +1,29 @@
+import shutil
+import tempfile
 from http import HTTPStatus
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
 
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from . import backends, forms, hashers
+
 User = get_user_model()
 
+TEMP_CACHE_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+FILE_CACHE = {'default': {
+    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    'LOCATION': TEMP_CACHE_DIR,
+}}
+
 
 class UserURLTests(TestCase):
     @classmethod
@@ -89,3 +107,104 @@ class UserURLTests(TestCase):
             with self.subTest(url=url):
                 response = self.authorized_client.get(url).status_code
                 self.assertEqual(status_code, response)
+
+
+@override_settings(CACHES=FILE_CACHE)
+class CachedUserTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_CACHE_DIR, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='test_username', password='Test1234'
+        )
+        self.client.force_login(self.user)
+
+    def user_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('posts:index'))
+        return [
+            query for query in queries
+            if query['sql'].startswith('SELECT "auth_user"."id"')
+        ]
+
+    def test_user_loaded_once(self):
+        """Пользователь запроса загружается из базы только один раз."""
+        self.user_queries()
+        self.assertEqual(self.user_queries(), [])
+
+    def test_password_change_logs_out(self):
+        """После смены пароля закэшированная сессия недействительна."""
+        self.user_queries()
+        self.user.set_password('Другой1234')
+        self.user.save()
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    def test_password_not_cached(self):
+        """В кэше нет хэша пароля."""
+        self.user_queries()
+        fields = cache.get(backends.USER_KEY.format(self.user.pk))
+        self.assertNotIn('password', fields)
+        self.assertNotIn(self.user.password, fields.values())
+
+    def test_process_local_cache_not_used(self):
+        """На LocMemCache пользователь всегда читается из базы."""
+        with self.settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}):
+            self.user_queries()
+            self.assertEqual(len(self.user_queries()), 1)
+
+
+class PasswordHashingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='test_username', password='Test1234'
+        )
+
+    def login(self):
+        return self.client.post(reverse('users:login'), {
+            'username': 'test_username',
+            'password': 'Test1234',
+        })
+
+    def test_login_counts_hashing(self):
+        """Вход проверяет пароль в пуле и учитывает время хэширования."""
+        with self.assertLogs('users.hashers', 'INFO'):
+            response = self.login()
+        self.assertRedirects(response, reverse('posts:index'))
+        self.assertEqual(hashers.metrics()['count'], 1)
+
+    def test_stats_require_shared_cache(self):
+        """На LocMemCache команда статистики отказывается работать."""
+        with self.assertRaises(CommandError):
+            call_command('password_hash_stats', stdout=StringIO())
+        self.addCleanup(shutil.rmtree, TEMP_CACHE_DIR, True)
+        with self.settings(CACHES=FILE_CACHE):
+            cache.clear()
+            self.login()
+            output = StringIO()
+            call_command('password_hash_stats', stdout=output)
+        self.assertIn('Хэширований: 1', output.getvalue())
+
+    def test_login_rehashes_outdated_password(self):
+        """Хэш с устаревшей стоимостью пересчитывается при входе."""
+        with self.settings(PASSWORD_PBKDF2_ITERATIONS=1000):
+            self.user.set_password('Test1234')
+            self.user.save()
+        self.login()
+        self.user.refresh_from_db()
+        self.assertFalse(hashers.needs_rehash(self.user.password))
+
+    def test_login_busy(self):
+        """При переполненной очереди вход отклоняется с ошибкой формы."""
+        with mock.patch.object(
+            hashers.HashingPool, 'run', side_effect=hashers.HashingBusy
+        ):
+            response = self.login()
+        self.assertFormError(response, 'form', None, forms.BUSY_MESSAGE)
@@ -1,15 +1,13 @@
 from django.contrib.auth import views as view
 from django.urls import path
 
-from .views import SignUp
+from .views import Login, SignUp
 
 app_name = 'users'
 
 urlpatterns = [
     path('signup/', SignUp.as_view(), name='signup'),
-    path('login/', view.LoginView.as_view(
-        template_name='users/login.html'),
-        name='login'),
+    path('login/', Login.as_view(), name='login'),
     path('logout/', view.LogoutView.as_view(
         template_name='users/logged_out.html'),
         name='logout'),
@@ -1,10 +1,24 @@
+from django.contrib.auth.views import LoginView
 from django.urls import reverse_lazy
 from django.views.generic import CreateView
 
-from .forms import CreationForm
+from .forms import BUSY_MESSAGE, CreationForm, LoginForm
+from .hashers import HashingBusy
 
 
 class SignUp(CreateView):
     form_class = CreationForm
     success_url = reverse_lazy('posts:index')
     template_name = 'users/signup.html'
+
+    def form_valid(self, form):
+        try:
+            return super().form_valid(form)
+        except HashingBusy:
+            form.add_error(None, BUSY_MESSAGE)
+            return self.form_invalid(form)
+
+
+class Login(LoginView):
+    form_class = LoginForm
+    template_name = 'users/login.html'
@@ -32,10 +32,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.AnonymousSessionMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
@@ -43,6 +45,10 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'yatube.urls'
 
+COMPRESS_MIN_SIZE: int = 512
+COMPRESS_GZIP_LEVEL: int = 6
+COMPRESS_BROTLI_QUALITY: int = 5
+
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 TEMPLATES = [
@@ -88,6 +94,32 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Основной хэшер выбирается переменной окружения PASSWORD_HASHER:
+# pbkdf2 (по умолчанию), argon2 (нужен argon2-cffi) или bcrypt
+# (нужен bcrypt). Остальные остаются для проверки старых хэшей,
+# которые пересчитываются при следующем входе.
+PASSWORD_HASHER_CHOICES = {
+    'pbkdf2': 'users.hashers.PBKDF2PasswordHasher',
+    'argon2': 'users.hashers.Argon2PasswordHasher',
+    'bcrypt': 'users.hashers.BCryptSHA256PasswordHasher',
+}
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'pbkdf2')
+PASSWORD_HASHERS = [PASSWORD_HASHER_CHOICES[PASSWORD_HASHER]] + [
+    path for name, path in PASSWORD_HASHER_CHOICES.items()
+    if name != PASSWORD_HASHER
+]
+PASSWORD_PBKDF2_ITERATIONS: int = 150000
+PASSWORD_ARGON2_TIME_COST: int = 2
+PASSWORD_ARGON2_MEMORY_COST: int = 512
+PASSWORD_ARGON2_PARALLELISM: int = 2
+PASSWORD_BCRYPT_ROUNDS: int = 12
+PASSWORD_HASH_WORKERS: int = os.cpu_count() or 1
+PASSWORD_HASH_QUEUE: int = 32
+PASSWORD_HASH_WAIT: float = 2.0
+
+AUTHENTICATION_BACKENDS = ['users.backends.CachedModelBackend']
+AUTH_USER_CACHE_TIMEOUT: int = 300
+
 LANGUAGE_CODE = 'ru'
 
 TIME_ZONE = 'UTC'
@@ -101,10 +133,24 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+if not DEBUG:
+    STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
 
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+DEFAULT_FILE_STORAGE = 'core.storage.ContentAddressedStorage'
+THUMBNAIL_STORAGE = 'django.core.files.storage.FileSystemStorage'
+MEDIA_RELEASE_GRACE: int = 600
+
+FILE_UPLOAD_MAX_MEMORY_SIZE: int = 2 * 1024 * 1024
+IMAGE_MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024
+IMAGE_MAX_PIXELS: int = 40_000_000
+IMAGE_MAX_FULL_DECODE_PIXELS: int = 16_000_000
+IMAGE_MEMORY_LIMIT: int = 64 * 1024 * 1024
+IMAGE_MAX_SIDE: int = 2048
+IMAGE_QUALITY: int = 85
 
 
 LOGIN_URL = 'users:login'
@@ -117,12 +163,23 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 
 PAGINATION: int = 10
+ESTIMATE_COUNT_FROM: int = 100000
+PAGINATOR_COUNT_TIMEOUT: int = 600
+PAGINATOR_WINDOW: int = 3
 INTRODUCTION: int = 15
 
 
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
 
+# Сессии читаются из кэша и только при промахе из базы.
+# Сообщения хранятся в cookie, чтобы не трогать сессию анонимов.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_PRUNE_BATCH_SIZE: int = 1000
+ANONYMOUS_COOKIE_NAME = 'anonymous'
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
@@ -131,4 +188,52 @@ CACHES = {
 
 INTERNAL_IPS = [
     '127.0.0.1',
-] 
\ No newline at end of file
+] 
+
+# Адрес сайта для ссылок в письмах, без завершающего слэша.
+SITE_URL = os.environ.get('SITE_URL', 'http://localhost:8000')
+DIGEST_PERIOD_HOURS: int = 24
+DIGEST_POSTS: int = 10
+DIGEST_BATCH_SIZE: int = 500
+UNREAD_CACHE_TIMEOUT: int = 60
+FOLLOWED_CACHE_TIMEOUT: int = 3600
+
+
+LIVE_BROKER = 'posts.live.LocalBroker'
+LIVE_QUEUE_SIZE: int = 50
+# Каждый открытый поток занимает поток воркера: держите число
+# ниже числа потоков воркера (threads у gunicorn gthread).
+LIVE_MAX_SUBSCRIBERS: int = int(
+    os.environ.get('LIVE_MAX_SUBSCRIBERS', 16)
+)
+LIVE_HEARTBEAT: int = 15
+# Короткие соединения: браузер переподключается через LIVE_RETRY
+# секунд и дополучает пропущенное по Last-Event-ID.
+LIVE_MAX_DURATION: int = 55
+LIVE_RETRY: int = 2
+LIVE_POLL_INTERVAL: float = 1.0
+LIVE_EVENT_TIMEOUT: int = 300
+
+
+POST_SNAPSHOT_EVERY: int = 10
+
+
+ARCHIVE_AFTER_DAYS: int = 365
+ARCHIVE_BATCH_SIZE: int = 500
+MODERATION_BATCH_SIZE: int = 500
+
+
+HOT_COMMENT_WEIGHT: float = 1.0
+HOT_FOLLOWER_WEIGHT: float = 0.1
+HOT_HALF_LIFE_HOURS: float = 24
+HOT_WINDOW_DAYS: int = 7
+HOT_DECAY_INTERVAL_HOURS: float = 1
+
+
+SUGGESTIONS_COUNT: int = 20
+SUGGESTIONS_SHOWN: int = 5
+SUGGESTIONS_CO_FOLLOW_WEIGHT: float = 0.5
+SUGGESTIONS_MAX_FOLLOWERS: int = 1000
+SUGGESTIONS_SIMILAR: int = 50
+SUGGESTIONS_BLOCK: int = 2000
+SUGGESTIONS_BATCH_SIZE: int = 500